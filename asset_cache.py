@@ -0,0 +1,104 @@
+import pygame
+
+# Общий кэш изображений на весь процесс.
+# Ключ — (путь, размер, оттенок, отражение), значение — готовая поверхность.
+# Поверхности из кэша разделяются между всеми спрайтами, поэтому их нельзя
+# изменять на месте (для эффектов делайте copy()).
+_source_cache = {}
+_image_cache = {}
+_generated_cache = {}
+
+
+def tint_image(image, color):
+    """Tints an image with a color"""
+    tinted = image.copy()
+    tinted.fill(color, special_flags=pygame.BLEND_MULT)
+    return tinted
+
+
+def load_image(path):
+    """Загружает изображение с диска один раз и возвращает convert_alpha-версию"""
+    image = _source_cache.get(path)
+    if image is None:
+        image = pygame.image.load(path).convert_alpha()
+        _source_cache[path] = image
+    return image
+
+
+def get_image(path, size=None, tint=None, flip=False):
+    """Возвращает общую поверхность для (path, size, tint, flip)"""
+    key = (path, size, tint, flip)
+    image = _image_cache.get(key)
+    if image is None:
+        if flip:
+            # Отражаем уже масштабированный и окрашенный вариант
+            image = pygame.transform.flip(get_image(path, size, tint), True, False)
+        else:
+            image = load_image(path)
+            if size is not None:
+                image = pygame.transform.scale(image, size)
+            if tint:
+                image = tint_image(image, tint)
+        _image_cache[key] = image
+    return image
+
+
+def get_frames(paths, size=None, tint=None, flip=False):
+    """Возвращает кортеж общих кадров анимации"""
+    key = (tuple(paths), size, tint, flip)
+    frames = _image_cache.get(key)
+    if frames is None:
+        frames = tuple(get_image(path, size, tint, flip) for path in paths)
+        _image_cache[key] = frames
+    return frames
+
+
+def _flash(image):
+    """Засвеченная версия (смешана с белым) — вспышка врага от удара"""
+    flashed = image.copy()
+    white_overlay = pygame.Surface(image.get_size())
+    white_overlay.fill((255, 255, 255))
+    flashed.blit(white_overlay, (0, 0), special_flags=pygame.BLEND_ADD)
+    return flashed
+
+
+def _hurt(image):
+    """Полупрозрачная красная версия — игрок получил урон"""
+    red_surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+    red_surface.fill((255, 0, 0, 128))
+    tinted = image.copy()
+    tinted.blit(red_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    return tinted
+
+
+_EFFECTS = {"flash": _flash, "hurt": _hurt}
+
+
+def get_effect(image, effect):
+    """Вариант кадра с эффектом ("flash" или "hurt"), создаётся один раз на кадр.
+
+    Ключ — сама поверхность, поэтому передавайте только долгоживущие кадры
+    (из этого кэша или загруженные один раз), а не временные копии.
+    """
+    key = (effect, image)
+    variant = _generated_cache.get(key)
+    if variant is None:
+        variant = _EFFECTS[effect](image)
+        _generated_cache[key] = variant
+    return variant
+
+
+def get_generated(key, factory):
+    """Кэширует процедурно созданную поверхность (factory вызывается один раз)"""
+    image = _generated_cache.get(key)
+    if image is None:
+        image = factory()
+        _generated_cache[key] = image
+    return image
+
+
+def clear_image_cache():
+    """Сбрасывает все закэшированные поверхности (например, при смене видеорежима)"""
+    _source_cache.clear()
+    _image_cache.clear()
+    _generated_cache.clear()
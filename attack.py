@@ -1,8 +1,46 @@
 import pygame
 import math
-import random
 import os
 from settings import *
+from asset_cache import load_image, get_image, get_frames, get_generated
+from object_pool import PooledSprite
+
+SWING_FRAME_PATHS = [
+    os.path.join("assets", "sword_effect", "attack1.png"),
+    os.path.join("assets", "sword_effect", "attack2.png"),
+    os.path.join("assets", "sword_effect", "attack3.png"),
+]
+
+# Готовые кадры взмаха: size_multiplier -> {направление: кадры}
+_swing_frames_cache = {}
+
+
+def get_swing_frames(size_multiplier, attack_direction):
+    """Возвращает кадры взмаха для множителя размера и направления (строятся один раз)"""
+    frames_by_direction = _swing_frames_cache.setdefault(size_multiplier, {})
+    frames = frames_by_direction.get(attack_direction)
+    if frames is None:
+        # Масштабируем кадры под размер атаки
+        attack_size = int(TILE_SIZE * 1.5 * size_multiplier)  # уменьшили с *3 до *1.5
+        frames = [pygame.transform.scale(load_image(path), (attack_size, attack_size)) for path in SWING_FRAME_PATHS]
+        if attack_direction == "left":
+            frames = [pygame.transform.flip(frame, True, False) for frame in frames]  # зеркальные для атаки влево
+        elif attack_direction == "down":
+            frames = [pygame.transform.rotate(frame, -90) for frame in frames]  # повёрнутые на 90° для атаки вниз
+        elif attack_direction == "up":
+            frames = [pygame.transform.rotate(frame, 90) for frame in frames]  # повёрнутые на -90° для атаки вверх
+        frames_by_direction[attack_direction] = frames
+    return frames
+
+
+def prepare_swing_frames(size_multiplier):
+    """Строит кадры взмаха для всех направлений и выбрасывает кадры старых размеров"""
+    for cached_multiplier in list(_swing_frames_cache):
+        if cached_multiplier != size_multiplier:
+            del _swing_frames_cache[cached_multiplier]
+    for attack_direction in ("right", "left", "down", "up"):
+        get_swing_frames(size_multiplier, attack_direction)
+
 
 class Attack(pygame.sprite.Sprite):
     def __init__(self, game, player):
@@ -31,44 +69,36 @@ class Attack(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         self.rect.center = player.rect.center
         self.duration = 200  # мс
-        self.spawn_time = pygame.time.get_ticks()
-        self.hit_enemies = set()
+        self.spawn_time = self.game.sim_clock.get_ticks()
+        self.hit_enemies = set()  # (враг, поколение пула): переиспользованный враг считается новым
 
     def update(self):
-        now = pygame.time.get_ticks()
+        now = self.game.sim_clock.get_ticks()
         if now - self.spawn_time > self.duration:
             self.kill()
             return
         
-        # Проверка столкновений с врагами
-        for enemy in self.game.enemies:
-            if enemy not in self.hit_enemies:
+        # Проверка столкновений только с врагами поблизости (по пространственной сетке)
+        if self.explosive:
+            candidates = self.game.enemy_grid.query_radius(self.rect.centerx, self.rect.centery, self.explosion_radius)
+        else:
+            candidates = self.game.enemy_grid.query_rect(self.rect)
+        for enemy in candidates:
+            if (enemy, enemy.pool_generation) not in self.hit_enemies:
                 if self.explosive:
                     # Взрывная атака - проверяем расстояние
                     distance = math.sqrt((enemy.rect.centerx - self.rect.centerx)**2 + 
                                        (enemy.rect.centery - self.rect.centery)**2)
                     if distance <= self.explosion_radius:
-                        enemy.take_damage(self.damage)
-                        self.hit_enemies.add(enemy)
-                        # Вызываем метод убийства врага для системы прокачки
-                        if enemy.health <= 0:
-                            self.player.on_kill_enemy()
-                            result = self.game.upgrade_manager.on_enemy_killed()
-                            if result == "spawn_boss":
-                                self.game.spawn_boss()
+                        enemy.take_damage(self.damage, "explosion")
+                        self.hit_enemies.add((enemy, enemy.pool_generation))
                 else:
                     # Обычная атака - проверяем столкновение
                     if self.rect.colliderect(enemy.rect):
-                        enemy.take_damage(self.damage)
-                        self.hit_enemies.add(enemy)
-                        # Вызываем метод убийства врага для системы прокачки
-                        if enemy.health <= 0:
-                            self.player.on_kill_enemy()
-                            result = self.game.upgrade_manager.on_enemy_killed()
-                            if result == "spawn_boss":
-                                self.game.spawn_boss()
+                        enemy.take_damage(self.damage, "attack")
+                        self.hit_enemies.add((enemy, enemy.pool_generation))
 
-class SwingAttack(pygame.sprite.Sprite):
+class SwingAttack(PooledSprite):
     def __init__(self, game, player, direction):
         super().__init__()
         self.game = game
@@ -79,34 +109,10 @@ class SwingAttack(pygame.sprite.Sprite):
         self.explosion_radius = TILE_SIZE * 3 * self.size_multiplier
         self.critical_chance = player.critical_chance
         self.duration = 180  # мс
-        self.spawn_time = pygame.time.get_ticks()
-        self.hit_enemies = set()
+        self.spawn_time = self.game.sim_clock.get_ticks()
+        self.hit_enemies = set()  # (враг, поколение пула): переиспользованный враг считается новым
         self.direction = direction  # (dx, dy) нормализованный вектор
         
-        # --- Анимация атаки ---
-        # Загружаем кадры анимации атаки
-        self.attack_frames = [
-            pygame.image.load(os.path.join("assets", "sword_effect", "attack1.png")).convert_alpha(),
-            pygame.image.load(os.path.join("assets", "sword_effect", "attack2.png")).convert_alpha(),
-            pygame.image.load(os.path.join("assets", "sword_effect", "attack3.png")).convert_alpha(),
-        ]
-        # Масштабируем кадры под размер атаки
-        attack_size = int(TILE_SIZE * 1.5 * self.size_multiplier)  # уменьшили с *3 до *1.5
-        self.attack_frames = [
-            pygame.transform.scale(frame, (attack_size, attack_size)) for frame in self.attack_frames
-        ]
-        # Создаём кадры для всех 4 направлений
-        self.attack_frames_right = self.attack_frames  # оригинальные кадры для атаки вправо
-        self.attack_frames_left = [
-            pygame.transform.flip(frame, True, False) for frame in self.attack_frames
-        ]  # зеркальные для атаки влево
-        self.attack_frames_down = [
-            pygame.transform.rotate(frame, -90) for frame in self.attack_frames
-        ]  # повёрнутые на 90° для атаки вниз
-        self.attack_frames_up = [
-            pygame.transform.rotate(frame, 90) for frame in self.attack_frames
-        ]  # повёрнутые на -90° для атаки вверх
-        
         # Переменные анимации
         self.current_frame = 0
         self.animation_timer = 0
@@ -122,15 +128,12 @@ class SwingAttack(pygame.sprite.Sprite):
             # Вертикальное движение
             self.attack_direction = "down" if dy > 0 else "up"
         
+        # --- Анимация атаки ---
+        # Кадры только для нужного направления, из кэша (без загрузки и трансформаций)
+        self.attack_frames = get_swing_frames(self.size_multiplier, self.attack_direction)
+        
         # Начальный кадр
-        if self.attack_direction == "right":
-            self.image = self.attack_frames_right[0]
-        elif self.attack_direction == "left":
-            self.image = self.attack_frames_left[0]
-        elif self.attack_direction == "down":
-            self.image = self.attack_frames_down[0]
-        else:  # up
-            self.image = self.attack_frames_up[0]
+        self.image = self.attack_frames[0]
         
         self.rect = self.image.get_rect()
         # Позиционируем атаку так, чтобы край был привязан к персонажу
@@ -153,13 +156,13 @@ class SwingAttack(pygame.sprite.Sprite):
         self.arc_radius = int(TILE_SIZE * 2 * self.size_multiplier)
 
     def update(self):
-        now = pygame.time.get_ticks()
+        now = self.game.sim_clock.get_ticks()
         if now - self.spawn_time > self.duration:
             self.kill()
             return
         
         # --- Анимация атаки ---
-        dt = 1 / 60  # Предполагаем 60 FPS
+        dt = SIM_DT  # Фиксированный шаг симуляции
         self.animation_timer += dt
         if self.animation_timer >= self.animation_speed:
             self.animation_timer = 0
@@ -169,14 +172,7 @@ class SwingAttack(pygame.sprite.Sprite):
                 self.current_frame = len(self.attack_frames) - 1
         
         # Обновляем кадр анимации
-        if self.attack_direction == "right":
-            self.image = self.attack_frames_right[self.current_frame]
-        elif self.attack_direction == "left":
-            self.image = self.attack_frames_left[self.current_frame]
-        elif self.attack_direction == "down":
-            self.image = self.attack_frames_down[self.current_frame]
-        else:  # up
-            self.image = self.attack_frames_up[self.current_frame]
+        self.image = self.attack_frames[self.current_frame]
         
         # Обновляем позицию атаки относительно игрока
         px, py = self.player.rect.center
@@ -195,9 +191,9 @@ class SwingAttack(pygame.sprite.Sprite):
         
         dx, dy = self.direction
         swing_dir_angle = -math.atan2(dy, dx)
-        # Проверка попадания по дуге
-        for enemy in self.game.enemies:
-            if enemy not in self.hit_enemies:
+        # Проверка попадания по дуге (кандидаты — враги в радиусе дуги)
+        for enemy in self.game.enemy_grid.query_radius(px, py, self.arc_radius):
+            if (enemy, enemy.pool_generation) not in self.hit_enemies:
                 ex, ey = enemy.rect.center
                 vx = ex - px
                 vy = ey - py
@@ -210,27 +206,67 @@ class SwingAttack(pygame.sprite.Sprite):
                     continue
                 # Попадание!
                 dmg = self.damage
-                if self.critical_chance > 0 and random.random() < self.critical_chance:
+                if self.critical_chance > 0 and self.game.rng.random() < self.critical_chance:
                     dmg *= 2
-                enemy.take_damage(dmg)
+                enemy.take_damage(dmg, "swing")
                 if self.explosive:
-                    for other in self.game.enemies:
+                    for other in self.game.enemy_grid.query_radius(ex, ey, self.explosion_radius):
                         if other is not enemy and math.hypot(other.rect.centerx-ex, other.rect.centery-ey) < self.explosion_radius:
-                            other.take_damage(dmg//2)
+                            other.take_damage(dmg//2, "explosion")
                 if self.player.knockback_attack:
                     knockback_strength = 30 * self.size_multiplier
-                    enemy.x += dx * knockback_strength
-                    enemy.y += dy * knockback_strength
-                    enemy.rect.x = int(enemy.x)
-                    enemy.rect.y = int(enemy.y)
-                self.hit_enemies.add(enemy)
-                if enemy.health <= 0:
-                    self.player.on_kill_enemy()
-                    result = self.game.upgrade_manager.on_enemy_killed()
-                    if result == "spawn_boss":
-                        self.game.spawn_boss()
+                    enemy.set_position(enemy.x + dx * knockback_strength, enemy.y + dy * knockback_strength)
+                self.hit_enemies.add((enemy, enemy.pool_generation))
+
+# Количество заранее отрисованных углов поворота пронзающей морковки
+PIERCING_CARROT_ANGLE_BUCKETS = 64
+
+# (размер rect, [изображение для каждого угла]) — строится при первом выстреле
+_piercing_carrot_images = None
+
+
+def create_piercing_carrot_base():
+    """Создаёт серую морковку, повёрнутую на 135 градусов (исходная поза снаряда)"""
+    try:
+        img = load_image(os.path.join("assets", "carrot.png"))
+        # Растягиваем в 2 раза вдоль оси x = y (диагональное растяжение)
+        original_width = img.get_width() // 2
+        original_height = img.get_height() // 2
+        # Вычисляем новые размеры для диагонального растяжения
+        diagonal_length = math.sqrt(original_width**2 + original_height**2)
+        new_diagonal_length = diagonal_length * 2
+        # Вычисляем новые размеры
+        scale_factor = new_diagonal_length / diagonal_length
+        new_width = int(original_width * scale_factor)
+        new_height = int(original_height * scale_factor)
+        image = pygame.transform.scale(img, (new_width, new_height))
+        
+        # Делаем морковку серого цвета
+        gray_surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+        gray_surface.fill((150, 150, 150, 255))  # Серый цвет
+        image.blit(gray_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    except Exception:
+        image = pygame.Surface((32, 16), pygame.SRCALPHA)  # Увеличиваем размер
+        pygame.draw.ellipse(image, (150, 150, 150), (0, 0, 32, 8))
+    # Поворачиваем морковку на 135 градусов
+    return pygame.transform.rotate(image, 135)
 
-class PiercingCarrot(pygame.sprite.Sprite):
+
+def get_piercing_carrot_image(direction):
+    """Возвращает (изображение, размер rect) морковки для ближайшего к направлению угла"""
+    global _piercing_carrot_images
+    if _piercing_carrot_images is None:
+        base = create_piercing_carrot_base()
+        step = 360 / PIERCING_CARROT_ANGLE_BUCKETS
+        rotations = [pygame.transform.rotate(base, i * step) for i in range(PIERCING_CARROT_ANGLE_BUCKETS)]
+        _piercing_carrot_images = (base.get_size(), rotations)
+    rect_size, rotations = _piercing_carrot_images
+    # Поворачиваем морковку в направлении полета
+    angle = math.degrees(math.atan2(-direction[1], direction[0]))
+    bucket = round(angle * PIERCING_CARROT_ANGLE_BUCKETS / 360) % PIERCING_CARROT_ANGLE_BUCKETS
+    return rotations[bucket], rect_size
+
+class PiercingCarrot(PooledSprite):
     def __init__(self, game, player, direction):
         super().__init__()
         self.game = game
@@ -239,47 +275,20 @@ class PiercingCarrot(pygame.sprite.Sprite):
         self.speed = 8  # Скорость полета морковки
         self.damage = 20  # Урон морковки
         self.duration = 3000  # 3 секунды жизни
-        self.spawn_time = pygame.time.get_ticks()
-        self.hit_enemies = set()  # Список уже пораженных врагов
+        self.spawn_time = self.game.sim_clock.get_ticks()
+        self.hit_enemies = set()  # Уже поражённые (враг, поколение пула)
         
-        # Загружаем изображение морковки
-        try:
-            img = pygame.image.load(os.path.join("assets", "carrot.png")).convert_alpha()
-            # Растягиваем в 2 раза вдоль оси x = y (диагональное растяжение)
-            original_width = img.get_width() // 2
-            original_height = img.get_height() // 2
-            # Вычисляем новые размеры для диагонального растяжения
-            diagonal_length = math.sqrt(original_width**2 + original_height**2)
-            new_diagonal_length = diagonal_length * 2
-            # Вычисляем новые размеры
-            scale_factor = new_diagonal_length / diagonal_length
-            new_width = int(original_width * scale_factor)
-            new_height = int(original_height * scale_factor)
-            self.image = pygame.transform.scale(img, (new_width, new_height))
-            
-            # Делаем морковку серого цвета
-            gray_surface = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-            gray_surface.fill((150, 150, 150, 255))  # Серый цвет
-            self.image.blit(gray_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        except Exception:
-            self.image = pygame.Surface((32, 16), pygame.SRCALPHA)  # Увеличиваем размер
-            pygame.draw.ellipse(self.image, (150, 150, 150), (0, 0, 32, 8))
+        # Изображение берём из заранее повёрнутых вариантов (без трансформаций на выстрел)
+        self.image, rect_size = get_piercing_carrot_image(direction)
         
-        # Поворачиваем морковку на 135 градусов
-        self.image = pygame.transform.rotate(self.image, 135)
-        
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect((0, 0), rect_size)
         # Позиционируем морковку у игрока
         self.rect.center = player.rect.center
         self.x = float(self.rect.centerx)
         self.y = float(self.rect.centery)
-        
-        # Поворачиваем морковку в направлении полета
-        angle = math.degrees(math.atan2(-direction[1], direction[0]))
-        self.image = pygame.transform.rotate(self.image, angle)
 
     def update(self):
-        now = pygame.time.get_ticks()
+        now = self.game.sim_clock.get_ticks()
         if now - self.spawn_time > self.duration:
             self.kill()
             return
@@ -291,18 +300,12 @@ class PiercingCarrot(pygame.sprite.Sprite):
         self.y += dy
         self.rect.center = (int(self.x), int(self.y))
         
-        # Проверяем столкновения с врагами
-        for enemy in self.game.enemies:
-            if enemy not in self.hit_enemies:
+        # Проверяем столкновения с врагами рядом с морковкой
+        for enemy in self.game.enemy_grid.query_rect(self.rect):
+            if (enemy, enemy.pool_generation) not in self.hit_enemies:
                 if self.rect.colliderect(enemy.rect):
-                    enemy.take_damage(self.damage)
-                    self.hit_enemies.add(enemy)
-                    # Вызываем метод убийства врага для системы прокачки
-                    if enemy.health <= 0:
-                        self.player.on_kill_enemy()
-                        result = self.game.upgrade_manager.on_enemy_killed()
-                        if result == "spawn_boss":
-                            self.game.spawn_boss()
+                    enemy.take_damage(self.damage, "piercing_carrot")
+                    self.hit_enemies.add((enemy, enemy.pool_generation))
                     # Морковка исчезает после попадания
                     self.kill()
                     return
@@ -315,34 +318,39 @@ class PiercingCarrot(pygame.sprite.Sprite):
             self.kill()
             return
 
+LIGHTNING_FRAME_PATHS = [os.path.join("assets", "light_anim", f"light_anim{i}.png") for i in range(1, 4)]
+
+
+def _lightning_fallback_frames():
+    # Запасной вариант - простая молния (жёлтая линия)
+    surface = pygame.Surface((64, 320), pygame.SRCALPHA)  # 32*2 x 64*5
+    pygame.draw.line(surface, (255, 255, 0), (32, 0), (32, 320), 8)
+    return (surface,) * 3
+
+
+def get_lightning_frames():
+    """Кадры молнии, увеличенные по X в 2 раза и по Y в 5 раз (общие для всех ударов)"""
+    try:
+        source = load_image(LIGHTNING_FRAME_PATHS[0])
+        return get_frames(LIGHTNING_FRAME_PATHS, (source.get_width() * 2, source.get_height() * 5))
+    except Exception:
+        return get_generated("lightning_fallback", _lightning_fallback_frames)
+
+
 class LightningAttack(pygame.sprite.Sprite):
     def __init__(self, game, player, target_enemy):
         super().__init__()
         self.game = game
         self.player = player
         self.target_enemy = target_enemy
+        # Враг может умереть и вернуться из пула другим врагом — запоминаем поколение
+        self.target_generation = target_enemy.pool_generation
         self.damage = 999  # Убивает любого врага
         self.duration = 300  # 0.3 секунды жизни (еще быстрее исчезает)
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = self.game.sim_clock.get_ticks()
         
-        # Загружаем кадры анимации молнии
-        self.lightning_frames = []
-        try:
-            for i in range(1, 4):  # 3 кадра анимации
-                img = pygame.image.load(os.path.join("assets", "light_anim", f"light_anim{i}.png")).convert_alpha()
-                # Увеличиваем изображение: по X в 2 раза, по Y в 5 раз
-                original_width = img.get_width()
-                original_height = img.get_height()
-                new_width = original_width * 2
-                new_height = original_height * 5
-                scaled_img = pygame.transform.scale(img, (new_width, new_height))
-                self.lightning_frames.append(scaled_img)
-        except Exception:
-            # Запасной вариант - создаем простую молнию
-            for i in range(3):
-                surface = pygame.Surface((64, 320), pygame.SRCALPHA)  # 32*2 x 64*5
-                pygame.draw.line(surface, (255, 255, 0), (32, 0), (32, 320), 8)  # Желтая линия
-                self.lightning_frames.append(surface)
+        # Кадры анимации молнии из кэша (без загрузки и масштабирования на каждый удар)
+        self.lightning_frames = get_lightning_frames()
         
         self.current_frame = 0
         self.animation_timer = 0
@@ -361,13 +369,13 @@ class LightningAttack(pygame.sprite.Sprite):
         self.damage_dealt = False  # Флаг для отслеживания нанесения урона
 
     def update(self):
-        now = pygame.time.get_ticks()
+        now = self.game.sim_clock.get_ticks()
         if now - self.spawn_time > self.duration:
             self.kill()
             return
         
         # Анимация молнии (проигрывается один раз)
-        dt = 1 / 60  # Предполагаем 60 FPS
+        dt = SIM_DT  # Фиксированный шаг симуляции
         self.animation_timer += dt
         if self.animation_timer >= self.animation_speed:
             self.animation_timer = 0
@@ -379,6 +387,11 @@ class LightningAttack(pygame.sprite.Sprite):
         # Обновляем кадр анимации (без поворота)
         self.image = self.lightning_frames[self.current_frame]
         
+        # Цель уже убита (или переиспользована пулом) — молния гаснет без урона
+        if not self.target_enemy.alive() or self.target_enemy.pool_generation != self.target_generation:
+            self.kill()
+            return
+
         # Обновляем позицию (молния остается сверху над целью)
         tx, ty = self.target_enemy.rect.center
         self.x = tx
@@ -399,10 +412,5 @@ class LightningAttack(pygame.sprite.Sprite):
             
             # Проверяем, касается ли нижняя часть молнии врага
             if bottom_lightning_rect.colliderect(self.target_enemy.rect):
-                self.target_enemy.take_damage(self.damage)
-                self.damage_dealt = True
-                if self.target_enemy.health <= 0:
-                    self.player.on_kill_enemy()
-                    result = self.game.upgrade_manager.on_enemy_killed()
-                    if result == "spawn_boss":
-                        self.game.spawn_boss()
\ No newline at end of file
+                self.target_enemy.take_damage(self.damage, "lightning")
+                self.damage_dealt = True
\ No newline at end of file
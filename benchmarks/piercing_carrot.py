@@ -0,0 +1,78 @@
+"""Сравнение стоимости создания PiercingCarrot: старая схема против кэша углов.
+
+Запуск из корня проекта:
+    python -m benchmarks.piercing_carrot [количество_выстрелов]
+"""
+import os
+import sys
+import math
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from settings import WIDTH, HEIGHT
+from game_clock import GameClock
+
+
+class _Stub:
+    """Минимальная замена game/player: PiercingCarrot в __init__ читает player.rect и game.sim_clock"""
+    def __init__(self):
+        self.rect = pygame.Rect(0, 0, 32, 32)
+        self.sim_clock = GameClock()
+
+
+def legacy_spawn(direction):
+    """Повторяет старый PiercingCarrot.__init__: загрузка, масштаб, тонировка и два поворота"""
+    img = pygame.image.load(os.path.join("assets", "carrot.png")).convert_alpha()
+    original_width = img.get_width() // 2
+    original_height = img.get_height() // 2
+    diagonal_length = math.sqrt(original_width**2 + original_height**2)
+    scale_factor = diagonal_length * 2 / diagonal_length
+    image = pygame.transform.scale(img, (int(original_width * scale_factor), int(original_height * scale_factor)))
+    gray_surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+    gray_surface.fill((150, 150, 150, 255))
+    image.blit(gray_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    image = pygame.transform.rotate(image, 135)
+    angle = math.degrees(math.atan2(-direction[1], direction[0]))
+    return pygame.transform.rotate(image, angle)
+
+
+def run(shots=2000):
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    from attack import PiercingCarrot, get_piercing_carrot_image
+
+    rng = random.Random(0)
+    directions = []
+    for _ in range(shots):
+        angle = rng.uniform(0, 2 * math.pi)
+        directions.append((math.cos(angle), math.sin(angle)))
+
+    stub = _Stub()
+    start = time.perf_counter()
+    for direction in directions:
+        legacy_spawn(direction)
+    legacy = time.perf_counter() - start
+
+    # Первый вызов строит все повороты — считаем его отдельно
+    start = time.perf_counter()
+    get_piercing_carrot_image((1, 0))
+    warmup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for direction in directions:
+        PiercingCarrot(stub, stub, direction)
+    cached = time.perf_counter() - start
+
+    print(f"Выстрелов: {shots}")
+    print(f"До (загрузка + трансформации): {legacy / shots * 1e6:8.1f} мкс на морковку")
+    print(f"После (кэш углов):             {cached / shots * 1e6:8.1f} мкс на морковку")
+    print(f"Построение кэша (один раз):    {warmup * 1e3:8.2f} мс")
+    print(f"Ускорение: x{legacy / max(cached, 1e-9):.1f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,212 @@
+"""Набор сценариев для замера времени кадра без меню и без окна.
+
+Каждый сценарий собирает состояние прямо в Game (враги, морковки, бонусы,
+движение камеры), затем прогоняет фиксированное число кадров: шаг симуляции
+плюс полная отрисовка. Результат — JSON со средним, p95 и p99 временем кадра
+по каждому сценарию, чтобы сравнивать прогоны между коммитами.
+
+Запуск из корня проекта:
+    python -m benchmarks.scenarios [--frames 600] [--only enemies_500 ...] [--out result.json]
+"""
+import os
+import sys
+import math
+import json
+import time
+import random
+import argparse
+import platform
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import main
+import sound_bank
+from settings import TILE_SIZE, WIDTH, HEIGHT
+from controls import InputSource, FrameInput
+from enemy import Enemy, ENEMY_ARCHETYPES
+
+# Все обычные архетипы врагов из enemy.py (включая цветовые варианты), без босса.
+# Порядок зафиксирован, чтобы состав орды при том же зерне не менялся между коммитами
+ARCHETYPES = [
+    "basic", "fast", "strong", "fox", "black_fox", "red_fox", "pig", "sheep",
+    "cow", "dark_cow", "red_cow", "chicken", "black_chicken", "red_chicken",
+    "lama", "dark_lama", "red_lama", "boar", "dark_boar", "red_boar",
+]
+assert set(ARCHETYPES) == set(ENEMY_ARCHETYPES) - {"boss"}
+
+
+class ScenarioInput(InputSource):
+    """Игрок стоит на месте; при attack=True бьёт при каждой возможности, прицел вращается"""
+
+    def __init__(self, attack=False):
+        self.attack = attack
+
+    def poll(self, game):
+        px, py = game.player.rect.center
+        angle = game.sim_clock.frame * 0.05
+        aim = (px + 100 * math.cos(angle), py + 100 * math.sin(angle))
+        return FrameInput(aim=aim, attack=self.attack)
+
+
+def spawn_ring(game, rng, count, min_dist=200, max_dist=1200):
+    """Создаёт count случайных врагов в кольце вокруг игрока"""
+    px, py = game.player.rect.center
+    for _ in range(count):
+        angle = rng.uniform(0, 2 * math.pi)
+        distance = rng.uniform(min_dist, max_dist)
+        x = px + distance * math.cos(angle)
+        y = py + distance * math.sin(angle)
+        enemy = Enemy(game, x / TILE_SIZE, y / TILE_SIZE, rng.choice(ARCHETYPES))
+        game.add_enemy(enemy)
+
+
+def setup_enemies(count):
+    def setup(game, rng):
+        spawn_ring(game, rng, count)
+    return setup
+
+
+def setup_carrots(count):
+    def setup(game, rng):
+        px, py = game.player.rect.center
+        for _ in range(count):
+            # Не ближе 64 пикселей к игроку, чтобы морковки не собрались сами
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(64, 1500)
+            game.pickups.drop(px + distance * math.cos(angle), py + distance * math.sin(angle))
+    return setup
+
+
+def setup_loadout(game, rng):
+    """Взрывная атака + отбрасывание + магические морковки против постоянной орды"""
+    player = game.player
+    player.explosive_attack = True
+    player.knockback_attack = True
+    player.has_magic_carrots = True
+    player.magic_carrots_count = 3
+    player.magic_carrots_active = True  # без таймера в game.scheduler они не выключатся
+    game.input = ScenarioInput(attack=True)
+    horde = 300
+    spawn_ring(game, rng, horde, min_dist=80, max_dist=600)
+
+    def per_frame(game, frame):
+        # Убитых врагов сразу заменяем
+        missing = horde - len(game.enemies)
+        if missing > 0:
+            spawn_ring(game, rng, missing, min_dist=300, max_dist=600)
+    return per_frame
+
+
+def setup_map_pan(game, rng):
+    """Пустая карта 150x150, камера облетает её по фигуре Лиссажу"""
+    map_w = game.map.width * TILE_SIZE
+    map_h = game.map.height * TILE_SIZE
+    player = game.player
+
+    def per_frame(game, frame):
+        t = frame / 120
+        player.x = map_w / 2 + (map_w / 2 - WIDTH / 2) * math.sin(t)
+        player.y = map_h / 2 + (map_h / 2 - HEIGHT / 2) * math.sin(2 * t)
+    return per_frame
+
+
+SCENARIOS = {
+    "enemies_100": setup_enemies(100),
+    "enemies_500": setup_enemies(500),
+    "enemies_2000": setup_enemies(2000),
+    "carrots_1000": setup_carrots(1000),
+    "loadout_explosive_knockback_magic": setup_loadout,
+    "map_pan": setup_map_pan,
+}
+
+
+def percentile(sorted_values, p):
+    """Перцентиль по ближайшему рангу"""
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def run_scenario(name, frames, warmup, seed, use_enemy_engine=None):
+    game = main.Game(ScenarioInput(), seed=seed, use_enemy_engine=use_enemy_engine)
+    game.state = 'playing'
+    game.spawning_enabled = False
+    # Игрок не должен умереть посреди замера
+    game.player.max_health = game.player.health = 10 ** 9
+    rng = random.Random(seed)
+    per_frame = SCENARIOS[name](game, rng)
+
+    frame_times = []
+    update_times = []
+    render_times = []
+    for frame in range(warmup + frames):
+        if game.upgrade_manager.showing_upgrade_screen:
+            game.select_upgrade(0)
+        if per_frame is not None:
+            per_frame(game, frame)
+        start = time.perf_counter()
+        game.step()
+        stepped = time.perf_counter()
+        game.render(1.0)
+        end = time.perf_counter()
+        if frame >= warmup:
+            frame_times.append(end - start)
+            update_times.append(stepped - start)
+            render_times.append(end - stepped)
+
+    ordered = sorted(frame_times)
+    to_ms = 1000 / len(frame_times)
+    return {
+        "frames": len(frame_times),
+        "mean_ms": round(sum(frame_times) * to_ms, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "update_mean_ms": round(sum(update_times) * to_ms, 3),
+        "render_mean_ms": round(sum(render_times) * to_ms, 3),
+        "enemies_at_end": len(game.enemies),
+        "sprites_at_end": len(game.all_sprites),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Сценарные бенчмарки времени кадра")
+    parser.add_argument("--frames", type=int, default=600, help="кадров на сценарий (после прогрева)")
+    parser.add_argument("--warmup", type=int, default=60, help="кадров прогрева (не учитываются)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), help="запустить только эти сценарии")
+    parser.add_argument("--no-engine", action="store_true", help="без векторного EnemyEngine")
+    parser.add_argument("--out", metavar="PATH", help="записать JSON в файл (иначе в stdout)")
+    return parser.parse_args(argv)
+
+
+def run(argv=None):
+    args = parse_args(argv)
+    sound_bank.set_enabled(False)
+    use_enemy_engine = False if args.no_engine else None
+    results = {}
+    for name in args.only or SCENARIOS:
+        results[name] = run_scenario(name, args.frames, args.warmup, args.seed, use_enemy_engine)
+        print(f"{name:36s} mean {results[name]['mean_ms']:7.2f} мс  "
+              f"p95 {results[name]['p95_ms']:7.2f}  p99 {results[name]['p99_ms']:7.2f}", file=sys.stderr)
+    report = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "enemy_engine": not args.no_engine and main.enemy_engine.available(),
+        "frames": args.frames,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "scenarios": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    run()
@@ -4,13 +4,22 @@ from settings import *
 class Camera:
     def __init__(self, width, height):
         self.offset = pygame.Vector2(0, 0)
+        self.prev_offset = pygame.Vector2(0, 0)  # смещение на предыдущем шаге симуляции
         self.width = width
         self.height = height
 
     def apply(self, target):
-        return target.rect.move(self.offset.x, self.offset.y)
+        return self.apply_rect(target.rect)
+
+    def apply_rect(self, rect):
+        return rect.move(self.offset.x, self.offset.y)
 
     def update(self, target):
+        self.prev_offset = self.offset
         x = -target.rect.x + WIDTH // 2
         y = -target.rect.y + HEIGHT // 2
-        self.offset = pygame.Vector2(x, y)
\ No newline at end of file
+        self.offset = pygame.Vector2(x, y)
+
+    def snap(self):
+        """Забывает предыдущее смещение (после телепорта/перезапуска — без интерполяции)"""
+        self.prev_offset = pygame.Vector2(self.offset)
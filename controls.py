@@ -0,0 +1,130 @@
+import random
+import pygame
+
+
+class FrameInput:
+    """Ввод игрока на один шаг симуляции"""
+
+    def __init__(self, move_x=0, move_y=0, aim=(0, 0), attack=False):
+        self.move_x = move_x  # -1, 0 или 1
+        self.move_y = move_y  # -1, 0 или 1
+        self.aim = aim  # точка прицеливания в мировых координатах
+        self.attack = attack  # нажата атака на этом шаге
+
+
+class InputSource:
+    """Источник ввода для Game: poll() вызывается один раз за шаг симуляции"""
+
+    def begin_run(self, game):
+        """Вызывается из Game.reset_game перед новым забегом"""
+
+    def request_attack(self):
+        """Атака из обработки событий окна (по умолчанию игнорируется)"""
+
+    def request_upgrade(self, index):
+        """Выбор улучшения из обработки событий окна (по умолчанию игнорируется)"""
+
+    def poll(self, game):
+        return FrameInput(aim=game.player.rect.center)
+
+    def choose_upgrade(self, game):
+        """Индекс улучшения на экране повышения уровня или None, если выбора ещё нет"""
+        return None
+
+    def close(self):
+        pass
+
+
+class KeyboardMouseInput(InputSource):
+    """Живой ввод с клавиатуры и мыши"""
+
+    def __init__(self):
+        self.attack_requested = False
+        self.upgrade_requested = None
+
+    def request_attack(self):
+        """Вызывается из обработки событий (ПРОБЕЛ/клик); атака попадёт в следующий шаг"""
+        self.attack_requested = True
+
+    def request_upgrade(self, index):
+        self.upgrade_requested = index
+
+    def poll(self, game):
+        keys = pygame.key.get_pressed()
+        move_x, move_y = 0, 0
+        if keys[pygame.K_w]:
+            move_y = -1
+        if keys[pygame.K_s]:
+            move_y = 1
+        if keys[pygame.K_a]:
+            move_x = -1
+        if keys[pygame.K_d]:
+            move_x = 1
+        aim = game.screen_to_world(pygame.mouse.get_pos())
+        attack = self.attack_requested
+        self.attack_requested = False
+        return FrameInput(move_x, move_y, aim, attack)
+
+    def choose_upgrade(self, game):
+        index = self.upgrade_requested
+        self.upgrade_requested = None
+        return index
+
+
+class IdleBot(InputSource):
+    """Бот, который стоит на месте и ничего не делает (чистая нагрузка от врагов)"""
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    def begin_run(self, game):
+        # Каждый забег бот начинает с одного и того же состояния
+        self.rng = random.Random(self.seed)
+
+    def choose_upgrade(self, game):
+        return self.rng.randrange(len(game.upgrade_manager.upgrade_options))
+
+
+class KiteBot(IdleBot):
+    """Простой бот: держит дистанцию до ближайшего врага, бьёт его и берёт случайные улучшения"""
+
+    def __init__(self, seed=None, danger_radius=120, search_radius=600):
+        super().__init__(seed)
+        self.danger_radius = danger_radius
+        self.search_radius = search_radius
+        self.wander = (1, 0)
+
+    def begin_run(self, game):
+        super().begin_run(game)
+        self.wander = (1, 0)
+
+    def poll(self, game):
+        player = game.player
+        px, py = player.rect.center
+        nearest = None
+        nearest_dist_sq = self.search_radius ** 2
+        for enemy in game.enemy_grid.query_radius(px, py, self.search_radius):
+            ex, ey = enemy.rect.center
+            dist_sq = (ex - px) ** 2 + (ey - py) ** 2
+            if dist_sq < nearest_dist_sq:
+                nearest, nearest_dist_sq = enemy, dist_sq
+        # Раз в секунду меняем направление блуждания
+        if game.sim_clock.frame % 60 == 0:
+            self.wander = (self.rng.choice((-1, 0, 1)), self.rng.choice((-1, 0, 1)))
+        if nearest is None:
+            return FrameInput(self.wander[0], self.wander[1], (px + 1, py))
+        ex, ey = nearest.rect.center
+        move_x, move_y = self.wander
+        if nearest_dist_sq < self.danger_radius ** 2:
+            # Отступаем от ближайшего врага
+            move_x = (px > ex) - (px < ex)
+            move_y = (py > ey) - (py < ey)
+        attack = nearest_dist_sq < (player.attack_size_multiplier * 64) ** 2 and player.can_attack()
+        return FrameInput(move_x, move_y, (ex, ey), attack)
+
+
+BOTS = {
+    "idle": IdleBot,
+    "kite": KiteBot,
+}
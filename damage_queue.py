@@ -0,0 +1,57 @@
+import sound_bank
+from settings import DAMAGE_NUMBERS_PER_STEP
+from event_bus import KillEvent
+
+
+class DamageQueue:
+    """Урон по врагам за шаг симуляции, применяемый одним пакетом.
+
+    Все источники (взмах, взрыв, морковки, молния) только записывают удары
+    через Enemy.take_damage -> hit(). resolve() в конце прохода обновления
+    применяет их разом: по каждому врагу одно суммарное число урона и одна
+    вспышка, каждый звук попадания — не больше раза за шаг, убийство — одно
+    на врага, даже если его добили несколько источников. Убийства уходят
+    подписчикам game.events как KillEvent.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.pending = {}  # враг -> [суммарный урон, последний источник]
+
+    def __len__(self):
+        return len(self.pending)
+
+    def hit(self, enemy, amount, source=None):
+        entry = self.pending.get(enemy)
+        if entry is None:
+            self.pending[enemy] = [amount, source]
+        else:
+            entry[0] += amount
+            entry[1] = source
+
+    def resolve(self):
+        """Применяет накопленный урон; возвращает число убитых"""
+        if not self.pending:
+            return 0
+        pending = self.pending
+        self.pending = {}  # удары из обработчиков событий попадут в следующий шаг
+        game = self.game
+        numbers_left = DAMAGE_NUMBERS_PER_STEP
+        sounds = {}  # звуки попаданий за шаг, по одному разу (в порядке ударов)
+        kills = []
+        for enemy, (amount, source) in pending.items():
+            if not enemy.alive():
+                continue  # убит не уроном (например, сброс забега)
+            enemy.apply_damage(amount)
+            if numbers_left > 0:
+                enemy.spawn_damage_number(amount)
+                numbers_left -= 1
+            sounds[enemy.archetype.hit_sound] = True
+            if enemy.health <= 0:
+                kills.append(KillEvent(enemy, source, amount))
+                enemy.kill()  # добыча падает здесь (см. Enemy.kill)
+        for name in sounds:
+            sound_bank.play(name)
+        for event in kills:
+            game.events.publish(event)
+        return len(kills)
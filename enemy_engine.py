@@ -0,0 +1,274 @@
+"""Векторизованная симуляция врагов на NumPy (структура массивов).
+
+Позиции, скорости и таймеры атаки всех врагов лежат в непрерывных массивах,
+а движение к игроку, мягкое расталкивание и урон при контакте считаются
+одной серией векторных операций на кадр. В спрайты результат записывается
+только для отрисовки (x, y, rect, facing_right).
+
+NumPy — необязательная зависимость: если его нет, available() вернёт False
+и игра использует обычный Enemy.update_movement().
+"""
+from map import SOLID
+from settings import TILE_SIZE, ENEMY_GRID_CELL_SIZE, ENEMY_LOD_INTERVAL
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy не установлен
+    np = None
+
+# Сила мягкого расталкивания (пикселей за одного соседа), как в Enemy.update_movement
+PUSH_STRENGTH = 2
+# Смещения соседних ячеек для поиска пар
+_NEIGHBOUR_OFFSETS = [(ox, oy) for ox in (-1, 0, 1) for oy in (-1, 0, 1)]
+# Множитель для упаковки (cx, cy) в один int64-ключ
+_KEY_STRIDE = 1 << 20
+
+
+def available():
+    """True, если NumPy установлен и движок можно включить"""
+    return np is not None
+
+
+class EnemyEngine:
+    def __init__(self, game, capacity=256):
+        self.game = game
+        self.count = 0
+        self.sprites = []
+        self._flow_version = 0  # версия FlowField, из которой скопированы массивы направлений
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old_count = self.count
+        old = getattr(self, "x", None)
+        fields = {
+            "x": np.float64, "y": np.float64, "speed": np.float64,
+            "width": np.int64, "height": np.int64,
+            "damage": np.int64, "attack_cooldown": np.int64, "last_attack_time": np.int64,
+            "lod_phase": np.int64,
+        }
+        for name, dtype in fields.items():
+            array = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                array[:old_count] = getattr(self, name)[:old_count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def add(self, enemy):
+        """Переносит состояние врага в массивы движка"""
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+        i = self.count
+        self.x[i] = enemy.x
+        self.y[i] = enemy.y
+        self.speed[i] = enemy.speed
+        self.width[i] = enemy.rect.width
+        self.height[i] = enemy.rect.height
+        self.damage[i] = enemy.damage
+        self.attack_cooldown[i] = enemy.attack_cooldown
+        self.last_attack_time[i] = enemy.last_attack_time
+        self.lod_phase[i] = enemy.lod_phase
+        enemy.engine_index = i
+        self.sprites.append(enemy)
+        self.count += 1
+
+    def remove(self, enemy):
+        """Удаляет врага, перенося последний элемент на его место (O(1))"""
+        i = getattr(enemy, "engine_index", None)
+        if i is None:
+            return
+        last = self.count - 1
+        if i != last:
+            for array in (self.x, self.y, self.speed, self.width, self.height,
+                          self.damage, self.attack_cooldown, self.last_attack_time, self.lod_phase):
+                array[i] = array[last]
+            moved = self.sprites[last]
+            self.sprites[i] = moved
+            moved.engine_index = i
+        self.sprites.pop()
+        self.count = last
+        enemy.engine_index = None
+
+    def sync_position(self, enemy):
+        """Принимает позицию, изменённую снаружи (например, отбрасыванием)"""
+        i = getattr(enemy, "engine_index", None)
+        if i is not None:
+            self.x[i] = enemy.x
+            self.y[i] = enemy.y
+
+    def _separation(self, left, top, width, height):
+        """Суммарный вектор расталкивания для каждого врага (только соседние ячейки)"""
+        n = left.shape[0]
+        center_x = left + width // 2
+        center_y = top + height // 2
+        cell_x = center_x // ENEMY_GRID_CELL_SIZE
+        cell_y = center_y // ENEMY_GRID_CELL_SIZE
+        keys = cell_x * _KEY_STRIDE + cell_y
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        # Для каждой из 9 соседних ячеек находим диапазон врагов в отсортированном массиве
+        # (искомые ключи тоже отсортированы, поэтому searchsorted работает быстро)
+        first, second = [], []
+        for ox, oy in _NEIGHBOUR_OFFSETS:
+            neighbour_keys = sorted_keys + (ox * _KEY_STRIDE + oy)
+            lo = np.searchsorted(sorted_keys, neighbour_keys, side="left")
+            hi = np.searchsorted(sorted_keys, neighbour_keys, side="right")
+            counts = hi - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+            first.append(np.repeat(order, counts))
+            second.append(order[starts + np.arange(total)])
+        if not first:
+            return np.zeros(n), np.zeros(n)
+        i = np.concatenate(first)
+        j = np.concatenate(second)
+
+        # Пересечение прямоугольников по правилам pygame.Rect.colliderect
+        overlap = ((i != j)
+                   & (left[i] < left[j] + width[j]) & (left[j] < left[i] + width[i])
+                   & (top[i] < top[j] + height[j]) & (top[j] < top[i] + height[i]))
+        i = i[overlap]
+        j = j[overlap]
+        vec_x = (center_x[i] - center_x[j]).astype(np.float64)
+        vec_y = (center_y[i] - center_y[j]).astype(np.float64)
+        dist = np.maximum(1.0, np.hypot(vec_x, vec_y))
+        push_x = np.bincount(i, weights=vec_x / dist * PUSH_STRENGTH, minlength=n)
+        push_y = np.bincount(i, weights=vec_y / dist * PUSH_STRENGTH, minlength=n)
+        return push_x, push_y
+
+    def step(self, now):
+        """Один кадр симуляции всех врагов"""
+        n = self.count
+        if n == 0:
+            return
+        player = self.game.player
+        x = self.x[:n]
+        y = self.y[:n]
+        width = self.width[:n]
+        height = self.height[:n]
+
+        # LOD: вне game.lod_rect враг двигается раз в ENEMY_LOD_INTERVAL шагов, но сразу на столько шагов
+        lod = self.game.lod_rect
+        left = x.astype(np.int64)
+        top = y.astype(np.int64)
+        near = ((left < lod.right) & (lod.left < left + width)
+                & (top < lod.bottom) & (lod.top < top + height))
+        due = (self.game.sim_clock.frame + self.lod_phase[:n]) % ENEMY_LOD_INTERVAL == 0
+        step_scale = np.where(near, 1.0, np.where(due, float(ENEMY_LOD_INTERVAL), 0.0))
+        active = step_scale > 0
+
+        # Движение к игроку
+        dx = player.x - x
+        dy = player.y - y
+        dist = np.maximum(1.0, np.hypot(dx, dy))
+        dx /= dist
+        dy /= dist
+        self._apply_flow_field(x, y, width, height, dx, dy)
+        old_x = x.copy()
+        old_y = y.copy()
+        old_cells = self._cell_keys(old_x, old_y, width, height)
+        x += dx * self.speed[:n] * step_scale
+        y += dy * self.speed[:n] * step_scale
+
+        # Мягкое расталкивание
+        push_x, push_y = self._separation(x.astype(np.int64), y.astype(np.int64), width, height)
+        x += push_x * step_scale
+        y += push_y * step_scale
+
+        # Непроходимые тайлы: отдельно по осям, как Map.slide
+        game_map = self.game.map
+        if game_map.has_solid:
+            self._slide(game_map, old_x, old_y, x, y, width, height)
+
+        # Контакт с игроком: откатываем движение и, если прошла перезарядка, наносим урон
+        prect = player.rect
+        left = x.astype(np.int64)
+        top = y.astype(np.int64)
+        contact = ((left < prect.right) & (prect.left < left + width)
+                   & (top < prect.bottom) & (prect.top < top + height))
+        if contact.any():
+            x[contact] = old_x[contact]
+            y[contact] = old_y[contact]
+            ready = contact & (now - self.last_attack_time[:n] > self.attack_cooldown[:n])
+            for i in np.flatnonzero(ready).tolist():
+                player.take_damage(int(self.damage[i]))
+                self.last_attack_time[i] = now
+
+        # Записываем результат в спрайты (только тем, кто двигался на этом шаге)
+        sprites = self.sprites
+        moved_now = np.flatnonzero(active)
+        for i, ex, ey, fx in zip(moved_now.tolist(), x[moved_now].tolist(), y[moved_now].tolist(),
+                                 dx[moved_now].tolist()):
+            enemy = sprites[i]
+            enemy.x = ex
+            enemy.y = ey
+            enemy.rect.topleft = (int(ex), int(ey))
+            if fx > 0:
+                enemy.facing_right = True
+            elif fx < 0:
+                enemy.facing_right = False
+        # В сетке перекладываем только тех, кто сменил ячейку
+        grid = self.game.enemy_grid
+        moved = np.flatnonzero(self._cell_keys(x, y, width, height) != old_cells)
+        for i in moved.tolist():
+            grid.update(self.sprites[i])
+
+    def _rect_blocked(self, game_map, x, y, width, height):
+        """Маска врагов, чей прямоугольник задевает solid-тайл (векторный Map.rect_blocked)"""
+        solid = (np.frombuffer(game_map.collision, dtype=np.uint8) & SOLID).astype(bool)
+        left = x.astype(np.int64)
+        top = y.astype(np.int64)
+        tile_left = np.maximum(0, left // TILE_SIZE)
+        tile_right = np.minimum(game_map.width - 1, (left + width - 1) // TILE_SIZE)
+        tile_top = np.maximum(0, top // TILE_SIZE)
+        tile_bottom = np.minimum(game_map.height - 1, (top + height - 1) // TILE_SIZE)
+        blocked = np.zeros(len(x), dtype=bool)
+        span_x = int((tile_right - tile_left).max(initial=0))
+        span_y = int((tile_bottom - tile_top).max(initial=0))
+        # Враги не больше пары тайлов, так что циклы здесь — по 2-3 смещения
+        for oy in range(span_y + 1):
+            ty = np.minimum(tile_top + oy, tile_bottom)
+            for ox in range(span_x + 1):
+                tx = np.minimum(tile_left + ox, tile_right)
+                inside = (tx >= tile_left) & (ty >= tile_top)
+                blocked |= inside & solid[np.clip(ty * game_map.width + tx, 0, len(solid) - 1)]
+        return blocked
+
+    def _slide(self, game_map, old_x, old_y, x, y, width, height):
+        """Откатывает по каждой оси движение, которое завело врага в стену"""
+        blocked_x = self._rect_blocked(game_map, x, old_y, width, height)
+        x[blocked_x] = old_x[blocked_x]
+        blocked_y = self._rect_blocked(game_map, x, y, width, height)
+        y[blocked_y] = old_y[blocked_y]
+
+    def _apply_flow_field(self, x, y, width, height, dx, dy):
+        """Заменяет направление к игроку на направление из поля потока там, где путь не прямой"""
+        flow = self.game.flow_field
+        if flow.open:
+            return
+        if self._flow_version != flow.version:
+            self._flow_dir_x = np.array(flow.dir_x)
+            self._flow_dir_y = np.array(flow.dir_y)
+            self._flow_steer = np.frombuffer(bytes(flow.steer), dtype=np.uint8).astype(bool)
+            self._flow_version = flow.version
+        size = flow.size
+        i = (x.astype(np.int64) + width // 2) // TILE_SIZE - flow.left
+        j = (y.astype(np.int64) + height // 2) // TILE_SIZE - flow.top
+        inside = np.flatnonzero((i >= 0) & (i < size) & (j >= 0) & (j < size))
+        index = j[inside] * size + i[inside]
+        steer = self._flow_steer[index]
+        rows = inside[steer]
+        index = index[steer]
+        dx[rows] = self._flow_dir_x[index]
+        dy[rows] = self._flow_dir_y[index]
+
+    def _cell_keys(self, x, y, width, height):
+        """Ключи ячеек сетки по центрам rect (как в SpatialHash)"""
+        cell_x = (x.astype(np.int64) + width // 2) // ENEMY_GRID_CELL_SIZE
+        cell_y = (y.astype(np.int64) + height // 2) // ENEMY_GRID_CELL_SIZE
+        return cell_x * _KEY_STRIDE + cell_y
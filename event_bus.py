@@ -0,0 +1,29 @@
+class KillEvent:
+    """Враг убит (публикует DamageQueue.resolve)"""
+    __slots__ = ("enemy", "archetype", "x", "y", "source", "damage")
+
+    def __init__(self, enemy, source, damage):
+        self.enemy = enemy  # после шага уйдёт в пул: не хранить дольше обработчика
+        self.archetype = enemy.archetype.name
+        self.x, self.y = enemy.rect.center
+        self.source = source  # чем добили: "swing", "explosion", "lightning", ...
+        self.damage = damage  # весь урон, полученный за этот шаг
+
+
+class EventBus:
+    """Подписка на события по их классу: publish(event) вызывает обработчики type(event)"""
+
+    def __init__(self):
+        self._handlers = {}  # класс события -> [обработчик]
+
+    def subscribe(self, event_type, handler):
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        handlers = self._handlers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, event):
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
@@ -1,21 +1,22 @@
 import pygame
 import os
 from settings import *
-from sound_settings import get_volume_multiplier
+from asset_cache import load_image, get_image
+from object_pool import PooledSprite
 
 class ExperienceOrb(pygame.sprite.Sprite):
     def __init__(self, game, x, y):
         super().__init__()
         self.game = game
-        self.image = pygame.image.load(os.path.join("assets", "carrot.png")).convert_alpha()
+        self.image = load_image(CARROT_IMAGE_PATH)  # общая поверхность из asset_cache
         self.rect = self.image.get_rect()
         self.rect.center = (x, y)
         self.lifetime = 10000  # 10 seconds
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = self.game.sim_clock.get_ticks()
 
     def update(self):
         # Remove after lifetime
-        if pygame.time.get_ticks() - self.spawn_time > self.lifetime:
+        if self.game.sim_clock.get_ticks() - self.spawn_time > self.lifetime:
             self.kill()
             return
         
@@ -24,38 +25,44 @@ class ExperienceOrb(pygame.sprite.Sprite):
             self.game.upgrade_manager.on_experience_orb_collected()
             self.kill()
 
-class Carrot(pygame.sprite.Sprite):
-    def __init__(self, game, x, y):
+CARROT_IMAGE_PATH = os.path.join("assets", "carrot.png")
+# Стопки морковок рисуются крупнее: (минимальная ценность, масштаб)
+CARROT_STACK_SCALES = [(10, 1.75), (5, 1.5), (2, 1.25), (1, 1.0)]
+
+
+class Carrot(PooledSprite):
+    """Морковка опыта на земле; value > 1 — стопка из нескольких слившихся морковок.
+
+    Подбор и слияние делает PickupSystem (pickups.py), у самой морковки нет update().
+    """
+
+    def __init__(self, game, x, y, value=1):
         super().__init__()
         self.game = game
-        
-        # --- Загрузка звука получения опыта ---
-        try:
-            self.exp_sound = pygame.mixer.Sound(os.path.join("assets", "sounds", "exp_sound.wav"))
-            self.exp_sound.set_volume(0.3)  # Устанавливаем громкость на 30%
-        except:
-            self.exp_sound = None
-            print("Не удалось загрузить звук получения опыта")
-        
-        self.image = pygame.image.load(os.path.join("assets", "carrot.png")).convert_alpha()
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.value = 0
+        self.scale = None
+        self.add_value(value)
         self.rect.center = (x, y)
-        # Убираем ограничение времени жизни для морковок
-        # self.lifetime = 10000  # 10 seconds
-        # self.spawn_time = pygame.time.get_ticks()
 
-    def update(self):
-        # Убираем проверку времени жизни - морковки не исчезают автоматически
-        # if pygame.time.get_ticks() - self.spawn_time > self.lifetime:
-        #     self.kill()
-        #     return
-        
-        # Check collision with player
-        if self.rect.colliderect(self.game.player.rect):
-            if self.exp_sound:
-                # Применяем коэффициент громкости
-                volume_multiplier = get_volume_multiplier()
-                self.exp_sound.set_volume(0.3 * volume_multiplier)
-                self.exp_sound.play()
-            self.game.upgrade_manager.on_experience_orb_collected()
-            self.kill() 
\ No newline at end of file
+    def add_value(self, value):
+        """Добавляет морковки в стопку; картинка растёт по ступеням CARROT_STACK_SCALES"""
+        self.value += value
+        for min_value, scale in CARROT_STACK_SCALES:
+            if self.value >= min_value:
+                break
+        if scale != self.scale:
+            self.scale = scale
+            # Картинки общие (из кэша) и не изменяются
+            base = load_image(CARROT_IMAGE_PATH)
+            if scale == 1.0:
+                self.image = base
+            else:
+                size = (int(base.get_width() * scale), int(base.get_height() * scale))
+                self.image = get_image(CARROT_IMAGE_PATH, size)
+            center = self.rect.center
+            self.rect = self.image.get_rect(center=center)
+
+    def kill(self):
+        self.game.pickups.remove(self)
+        super().kill()
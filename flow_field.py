@@ -0,0 +1,179 @@
+from settings import TILE_SIZE, FLOW_FIELD_RADIUS
+from map import SOLID
+
+# Цена шага по тайлу, соседнему с непроходимым (обычный тайл стоит 1)
+NEAR_WALL_COST = 3
+# Соседи по 8 направлениям: (dx, dy, длина вектора)
+_NEIGHBOURS = [(dx, dy, (dx * dx + dy * dy) ** 0.5)
+               for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+class FlowField:
+    """Поле направлений к игроку на сетке тайлов (одно на всех врагов).
+
+    Поле строится поиском кратчайших путей от тайла игрока в квадратном окне
+    (2 * radius + 1 тайлов) и перестраивается только когда игрок переходит
+    в другой тайл. Враг берёт направление из своего тайла, поэтому обход
+    препятствий стоит ему столько же, сколько прямое движение к игроку.
+
+    Там, где кратчайший путь не длиннее манхэттенского расстояния до игрока
+    (препятствий на пути нет, в том числе у соседних тайлов), и за пределами
+    окна direction() возвращает None — враг идёт к игроку по прямой, как
+    раньше. Если в окне нет ни одного непроходимого тайла, поле не строится
+    вовсе (open = True).
+    """
+
+    def __init__(self, game_map, radius=FLOW_FIELD_RADIUS):
+        self.map = game_map
+        self.radius = radius
+        self.size = 2 * radius + 1
+        self.origin = None  # тайл игрока, для которого построено поле
+        self.left = 0
+        self.top = 0
+        self.open = True
+        # По ячейкам окна (j * size + i): направление и флаг «идти по полю»
+        self.dir_x = [0.0] * (self.size * self.size)
+        self.dir_y = [0.0] * (self.size * self.size)
+        self.steer = bytearray(self.size * self.size)
+        self.version = 0  # растёт при каждой перестройке (для кэшей EnemyEngine)
+        self.builds = 0
+
+    def update(self, px, py):
+        """Перестраивает поле, если игрок (центр в пикселях) перешёл в другой тайл"""
+        origin = (int(px) // TILE_SIZE, int(py) // TILE_SIZE)
+        if origin == self.origin:
+            return False
+        self.rebuild(*origin)
+        return True
+
+    def invalidate(self):
+        """Карта проходимости изменилась — поле перестроится на следующем update()"""
+        self.origin = None
+
+    def rebuild(self, tx, ty):
+        size = self.size
+        radius = self.radius
+        left = tx - radius
+        top = ty - radius
+        self.origin = (tx, ty)
+        self.left = left
+        self.top = top
+        self.version += 1
+        self.builds += 1
+
+        game_map = self.map
+        if not game_map.has_solid:
+            self.open = True
+            self.steer[:] = bytes(size * size)
+            return
+        blocked = bytearray(size * size)
+        has_obstacles = False
+        for j in range(size):
+            y = top + j
+            row = j * size
+            for i in range(size):
+                x = left + i
+                if not (0 <= x < game_map.width and 0 <= y < game_map.height):
+                    blocked[row + i] = 1
+                elif game_map.collision[y * game_map.width + x] & SOLID:
+                    blocked[row + i] = 1
+                    has_obstacles = True
+        # Без препятствий кратчайший путь всегда прямой: поле не нужно
+        self.open = not has_obstacles
+        steer = self.steer
+        if self.open:
+            steer[:] = bytes(size * size)
+            return
+
+        # Тайлы вплотную к стене дороже: враги шире тайла и иначе цепляются за углы
+        cost = [1] * (size * size)
+        for index in range(size * size):
+            if blocked[index]:
+                j, i = divmod(index, size)
+                for dx, dy, _ in _NEIGHBOURS:
+                    if 0 <= i + dx < size and 0 <= j + dy < size:
+                        cost[(j + dy) * size + i + dx] = NEAR_WALL_COST
+
+        # Кратчайшие расстояния от игрока по 4 направлениям (Дейкстра на корзинах:
+        # веса маленькие целые, поэтому очередь — список списков по расстоянию)
+        dist = [-1] * (size * size)
+        start = radius * size + radius
+        dist[start] = 0
+        buckets = [[start]]
+        d = 0
+        while d < len(buckets):
+            for index in buckets[d]:
+                if dist[index] != d:
+                    continue  # уже нашли путь короче
+                j, i = divmod(index, size)
+                for ni, nj in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+                    if 0 <= ni < size and 0 <= nj < size:
+                        neighbour = nj * size + ni
+                        if blocked[neighbour]:
+                            continue
+                        nd = d + cost[neighbour]
+                        if dist[neighbour] < 0 or nd < dist[neighbour]:
+                            dist[neighbour] = nd
+                            while len(buckets) <= nd:
+                                buckets.append([])
+                            buckets[nd].append(neighbour)
+            d += 1
+
+        # Путь прямой, если он не длиннее манхэттенского расстояния до игрока.
+        # По прямой идём, только если путь прямой и у всех соседей: иначе центр
+        # врага срежет угол препятствия
+        direct = bytearray(size * size)
+        for j in range(size):
+            row = j * size
+            dj = abs(j - radius)
+            for i in range(size):
+                if dist[row + i] == abs(i - radius) + dj:
+                    direct[row + i] = 1
+        for index in [index for index in range(size * size) if not direct[index]]:
+            j, i = divmod(index, size)
+            for dx, dy, _ in _NEIGHBOURS:
+                if 0 <= i + dx < size and 0 <= j + dy < size:
+                    direct[(j + dy) * size + i + dx] = 0
+
+        # В остальных ячейках направление — к соседу с наименьшим расстоянием
+        dir_x = self.dir_x
+        dir_y = self.dir_y
+        for index in range(size * size):
+            d = dist[index]
+            if d <= 0 or direct[index]:
+                steer[index] = 0  # недостижимо, сам игрок или путь прямой
+                continue
+            j, i = divmod(index, size)
+            best = d
+            best_dir = None
+            for dx, dy, length in _NEIGHBOURS:
+                ni, nj = i + dx, j + dy
+                if not (0 <= ni < size and 0 <= nj < size):
+                    continue
+                nd = dist[nj * size + ni]
+                if nd < 0 or nd >= best:
+                    continue
+                # По диагонали только если оба боковых тайла проходимы (не срезаем углы)
+                if dx and dy and (dist[j * size + ni] < 0 or dist[nj * size + i] < 0):
+                    continue
+                best = nd
+                best_dir = (dx / length, dy / length)
+            if best_dir is None:
+                steer[index] = 0
+            else:
+                steer[index] = 1
+                dir_x[index], dir_y[index] = best_dir
+
+    def direction(self, x, y):
+        """Направление (dx, dy) для врага с центром в (x, y) или None — идти прямо к игроку"""
+        if self.open:
+            return None
+        i = int(x) // TILE_SIZE - self.left
+        j = int(y) // TILE_SIZE - self.top
+        size = self.size
+        if not (0 <= i < size and 0 <= j < size):
+            return None
+        index = j * size + i
+        if not self.steer[index]:
+            return None
+        return self.dir_x[index], self.dir_y[index]
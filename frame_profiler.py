@@ -0,0 +1,121 @@
+import time
+from collections import deque
+import pygame
+from text_cache import get_font
+
+# Фазы кадра в порядке выполнения и их цвета на графике
+PHASES = [
+    ("events", (120, 120, 255)),
+    ("player", (80, 220, 80)),
+    ("sprites", (255, 170, 60)),
+    ("spawning", (255, 90, 200)),
+    ("map_draw", (60, 200, 220)),
+    ("sprite_draw", (255, 230, 80)),
+    ("ui", (200, 200, 200)),
+    ("scale", (255, 80, 80)),
+    ("flip", (150, 90, 255)),
+    ("other", (110, 110, 110)),
+]
+PHASE_NAMES = [name for name, _ in PHASES]
+
+GRAPH_WIDTH = 240  # кадров в истории (один столбец пикселей на кадр)
+GRAPH_HEIGHT = 100
+GRAPH_MS = 33.3  # высота графика в миллисекундах (два кадра при 60 FPS)
+TEXT_REFRESH_FRAMES = 15  # текст перерисовывается не каждый кадр
+
+
+class FrameProfiler:
+    """Замер времени каждой фазы кадра с историей и наложенным графиком.
+
+    mark(phase) добавляет к фазе время, прошедшее с предыдущей отметки, поэтому
+    отметки ставятся в конце каждой фазы. Замеры идут всегда (это десяток вызовов
+    perf_counter за кадр), а график рисуется только когда он включён (F3).
+    """
+
+    def __init__(self, history=GRAPH_WIDTH):
+        self.history = {name: deque(maxlen=history) for name in PHASE_NAMES}
+        self.current = dict.fromkeys(PHASE_NAMES, 0.0)
+        self.last = time.perf_counter()
+        self.visible = False
+        self.frames = 0
+        self.font = None
+        self.graph = None
+        self.panel = None
+        self.text_lines = []
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def begin_frame(self):
+        """Закрывает предыдущий кадр и начинает новый"""
+        if self.frames:
+            for name in PHASE_NAMES:
+                self.history[name].append(self.current[name] * 1000)
+                self.current[name] = 0.0
+            if self.graph is not None:
+                self._draw_graph_column()
+        self.frames += 1
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def average(self, phase, frames=60):
+        """Среднее время фазы (мс) за последние frames кадров"""
+        values = self.history[phase]
+        if not values:
+            return 0.0
+        count = min(frames, len(values))
+        return sum(values[i] for i in range(len(values) - count, len(values))) / count
+
+    def _draw_graph_column(self):
+        """Сдвигает график на пиксель влево и дорисовывает последний кадр справа"""
+        graph = self.graph
+        graph.scroll(-1, 0)
+        x = GRAPH_WIDTH - 1
+        graph.fill((0, 0, 0, 160), (x, 0, 1, GRAPH_HEIGHT))
+        bottom = GRAPH_HEIGHT
+        scale = GRAPH_HEIGHT / GRAPH_MS
+        for name, color in PHASES:
+            height = self.history[name][-1] * scale
+            if height >= 0.5 and bottom > 0:
+                top = max(0, bottom - round(height))
+                graph.fill(color, (x, top, 1, bottom - top))
+                bottom = top
+        # Линия 16.7 мс (60 FPS)
+        graph.set_at((x, GRAPH_HEIGHT - round(1000 / 60 * scale)), (255, 255, 255))
+
+    def draw(self, surface, get_counts):
+        """Рисует график и таблицу фаз в левом нижнем углу; get_counts() -> {подпись: число}"""
+        if self.font is None:
+            self.font = get_font(18)
+        if self.graph is None:
+            self.graph = pygame.Surface((GRAPH_WIDTH, GRAPH_HEIGHT), pygame.SRCALPHA)
+            self.graph.fill((0, 0, 0, 160))
+        if not self.text_lines or self.frames % TEXT_REFRESH_FRAMES == 0:
+            lines = []
+            total = 0.0
+            for name, color in PHASES:
+                average = self.average(name)
+                total += average
+                lines.append(self.font.render(f"{name:12s} {average:6.2f} мс", True, color))
+            lines.append(self.font.render(f"кадр {total:6.2f} мс", True, (255, 255, 255)))
+            lines.append(self.font.render("  ".join(f"{label}: {value}" for label, value in get_counts().items()),
+                                          True, (255, 255, 255)))
+            self.text_lines = lines
+
+        line_height = self.font.get_linesize()
+        panel_height = GRAPH_HEIGHT + line_height * len(self.text_lines) + 12
+        top = surface.get_height() - panel_height - 10
+        width = max([GRAPH_WIDTH] + [line.get_width() for line in self.text_lines]) + 10
+        if self.panel is None or self.panel.get_size() != (width, panel_height):
+            self.panel = pygame.Surface((width, panel_height), pygame.SRCALPHA)
+            self.panel.fill((0, 0, 0, 150))
+        surface.blit(self.panel, (10, top))
+        y = top + 5
+        for line in self.text_lines:
+            surface.blit(line, (15, y))
+            y += line_height
+        surface.blit(self.graph, (15, y + 5))
@@ -0,0 +1,21 @@
+from settings import SIM_HZ
+
+
+class GameClock:
+    """Игровые часы, считающие шаги симуляции, а не реальное время.
+
+    get_ticks() возвращает миллисекунды как pygame.time.get_ticks(), но
+    вычисляет их из номера шага, поэтому таймеры игры не зависят ни от FPS,
+    ни от того, насколько быстро идёт симуляция (например, без окна).
+    """
+
+    def __init__(self):
+        self.frame = 0
+
+    def tick(self):
+        """Переходит к следующему шагу симуляции"""
+        self.frame += 1
+
+    def get_ticks(self):
+        """Игровое время в миллисекундах с начала забега"""
+        return self.frame * 1000 // SIM_HZ
@@ -0,0 +1,170 @@
+import pygame
+from settings import *
+from text_cache import render_text
+from utils import draw_health_bar
+
+
+class Widget:
+    """Элемент HUD со своей поверхностью.
+
+    bind() возвращает значения, от которых зависит картинка; render() рисует
+    её заново только когда они изменились (или после invalidate()), а в
+    остальных кадрах update() отдаёт готовую поверхность.
+    """
+
+    def __init__(self, bind):
+        self.bind = bind
+        self.value = None
+        self.surface = None
+        self.dirty = True
+        self.renders = 0  # сколько раз картинка строилась заново
+
+    def invalidate(self):
+        self.dirty = True
+
+    def update(self):
+        value = self.bind()
+        if self.dirty or value != self.value:
+            self.value = value
+            self.surface = self.render(value)
+            self.dirty = False
+            self.renders += 1
+        return self.surface
+
+    def render(self, value):
+        """Новая поверхность для value (None — виджет сейчас не рисуется)"""
+        return None
+
+    def draw(self, screen, pos):
+        surface = self.update()
+        if surface is not None:
+            screen.blit(surface, pos)
+
+
+class HealthBar(Widget):
+    """Полоса здоровья владельца (health, max_health)"""
+
+    def __init__(self, owner, width=100, height=10):
+        super().__init__(lambda: (owner.health, owner.max_health))
+        self.width = width
+        self.height = height
+
+    def render(self, value):
+        health, max_health = value
+        surface = pygame.Surface((self.width, self.height))
+        draw_health_bar(surface, 0, 0, health, max_health, width=self.width, height=self.height)
+        return surface
+
+
+class LevelProgress(Widget):
+    """Уровень и прогресс до следующего улучшения"""
+
+    bar_width = 200
+    bar_height = 10
+    bar_top = 30  # полоса под текстом
+
+    def __init__(self, game):
+        super().__init__(lambda: self.bound_state(game.upgrade_manager))
+
+    @staticmethod
+    def bound_state(manager):
+        if manager.showing_upgrade_screen:
+            return None
+        return manager.level, manager.current_kills, manager.kills_until_upgrade
+
+    def render(self, value):
+        if value is None:
+            return None
+        level, current_kills, kills_until_upgrade = value
+        progress_text = render_text(f"Уровень: {level} | Морковок до улучшения: {current_kills}/{kills_until_upgrade}",
+                                    24, (255, 255, 255))
+        bar_width = self.bar_width
+        bar_height = self.bar_height
+        bar_x, bar_y = 0, self.bar_top
+        surface = pygame.Surface((max(progress_text.get_width(), bar_width), bar_y + bar_height), pygame.SRCALPHA)
+        surface.blit(progress_text, (0, 0))
+
+        # Фон прогресс-бара
+        pygame.draw.rect(surface, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
+
+        # Заполнение прогресс-бара
+        progress = min(1.0, current_kills / kills_until_upgrade)
+        fill_width = int(bar_width * progress)
+        pygame.draw.rect(surface, (100, 255, 100), (bar_x, bar_y, fill_width, bar_height))
+
+        # Рамка прогресс-бара
+        pygame.draw.rect(surface, (255, 255, 255), (bar_x, bar_y, bar_width, bar_height), 1)
+        return surface
+
+
+class UpgradeChoice(Widget):
+    """Экран выбора улучшения: строится один раз на набор вариантов"""
+
+    card_width = 300
+    card_height = 100
+
+    def __init__(self, game):
+        super().__init__(lambda: self.bound_state(game.upgrade_manager))
+
+    @staticmethod
+    def bound_state(manager):
+        if not manager.showing_upgrade_screen:
+            return None
+        return tuple(manager.upgrade_options)
+
+    def render(self, options):
+        if options is None:
+            return None
+        # Затемнение фона
+        surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 180))
+
+        # Заголовок
+        title = render_text("ВЫБЕРИТЕ УЛУЧШЕНИЕ", 48, (255, 255, 255))
+        surface.blit(title, (WIDTH // 2 - title.get_width() // 2, 50))
+
+        # Инструкция
+        instruction = render_text("Нажмите 1, 2 или 3 для выбора", 24, (200, 200, 200))
+        surface.blit(instruction, (WIDTH // 2 - instruction.get_width() // 2, 100))
+
+        # Отображение улучшений
+        for i, upgrade in enumerate(options):
+            self.draw_option(surface, upgrade, i, WIDTH // 2, 150 + i * 120)
+        return surface
+
+    def draw_option(self, surface, upgrade, index, center_x, y):
+        """Отрисовывает одно улучшение"""
+        # Фон карточки
+        card_width = self.card_width
+        card_rect = pygame.Rect(center_x - card_width // 2, y, card_width, self.card_height)
+        pygame.draw.rect(surface, (50, 50, 50), card_rect)
+        pygame.draw.rect(surface, upgrade.color, card_rect, 3)
+
+        # Название
+        name_text = render_text(upgrade.name, 32, upgrade.color)
+        surface.blit(name_text, (center_x - name_text.get_width() // 2, y + 10))
+
+        # Описание (поддерживает переносы строк)
+        desc_lines = upgrade.description.split('\n')
+        for i, line in enumerate(desc_lines):
+            desc_text = render_text(line, 20, (200, 200, 200))
+            surface.blit(desc_text, (center_x - desc_text.get_width() // 2, y + 40 + i * 15))
+
+        # Клавиша выбора
+        key_text = render_text(f"{index + 1}", 24, (255, 255, 255))
+        key_rect = pygame.Rect(center_x - card_width // 2 - 30, y + 35, 20, 20)
+        pygame.draw.rect(surface, (100, 100, 100), key_rect)
+        pygame.draw.rect(surface, (255, 255, 255), key_rect, 2)
+        surface.blit(key_text, (key_rect.x + 5, key_rect.y + 2))
+
+
+class Hud:
+    """Экранный интерфейс забега: каждый кадр только блиты готовых поверхностей виджетов"""
+
+    def __init__(self, game):
+        self.progress = LevelProgress(game)
+        self.upgrade_choice = UpgradeChoice(game)
+
+    def draw(self, screen):
+        self.progress.draw(screen, (10, 60))
+        self.upgrade_choice.draw(screen, (0, 0))
@@ -1,5 +1,7 @@
+import os
 import re
 import ast
+import xml.etree.ElementTree as ET
 
 class LuaMapLoader:
     def __init__(self):
@@ -12,6 +14,7 @@ class LuaMapLoader:
                 content = file.read()
             # Используем только _simple_lua_parser для надёжности
             map_data = self._simple_lua_parser(content)
+            tile_properties = self._parse_tilesets(content, os.path.dirname(file_path))
             width = map_data.get('width', 30)
             height = map_data.get('height', 20)
             tile_width = map_data.get('tilewidth', 32)
@@ -38,7 +41,8 @@ class LuaMapLoader:
                 'height': height,
                 'tile_width': tile_width,
                 'tile_height': tile_height,
-                'layers': game_layers
+                'layers': game_layers,
+                'tile_properties': tile_properties
             }
         except Exception as e:
             print(f"Ошибка загрузки карты: {e}")
@@ -71,8 +75,11 @@ class LuaMapLoader:
     
     def _find_layers_block(self, content):
         """Находит блок layers = { ... } или layers : { ... } с учётом вложенности фигурных скобок"""
-        import re
-        match = re.search(r'layers\s*[:=]\s*\{', content)
+        return self._find_block(content, 'layers')
+
+    def _find_block(self, content, key):
+        """Находит блок key = { ... } с учётом вложенности фигурных скобок"""
+        match = re.search(r'\b' + key + r'\s*[:=]\s*\{', content)
         if not match:
             return ''
         start = content.find('{', match.start())
@@ -110,6 +117,89 @@ class LuaMapLoader:
             i += 1
         return blocks
 
+    def _top_level_blocks(self, content):
+        """Все блоки { ... } первого уровня вложенности"""
+        blocks = []
+        depth = 0
+        block_start = None
+        for i, char in enumerate(content):
+            if char == '{':
+                if depth == 0:
+                    block_start = i
+                depth += 1
+            elif char == '}' and depth:
+                depth -= 1
+                if depth == 0:
+                    blocks.append(content[block_start:i+1])
+        return blocks
+
+    def _parse_tilesets(self, content, map_dir):
+        """Свойства тайлов из всех тайлсетов карты: {tile_id: {имя: значение}}.
+
+        tile_id — как в слоях после _convert_tile_data (gid - 1). Тайлсет может
+        быть встроен в карту (tiles = {...}) или лежать отдельным .tsx файлом.
+        """
+        tile_properties = {}
+        tilesets_block = self._find_block(content, 'tilesets')
+        for tileset_block in self._top_level_blocks(tilesets_block[1:-1]):
+            firstgid_match = re.search(r'firstgid\s*=\s*(\d+)', tileset_block)
+            firstgid = int(firstgid_match.group(1)) if firstgid_match else 1
+            filename_match = re.search(r'filename\s*=\s*"([^"]*)"', tileset_block)
+            if filename_match:
+                tiles = self._parse_tsx(map_dir, filename_match.group(1))
+            else:
+                tiles = self._parse_lua_tiles(self._find_block(tileset_block, 'tiles'))
+            for local_id, properties in tiles.items():
+                tile_properties[firstgid + local_id - 1] = properties
+        return tile_properties
+
+    def _parse_lua_tiles(self, tiles_block):
+        """Свойства тайлов встроенного тайлсета: {локальный id: {имя: значение}}"""
+        tiles = {}
+        for tile_block in self._top_level_blocks(tiles_block[1:-1]):
+            id_match = re.search(r'\bid\s*=\s*(\d+)', tile_block)
+            properties_block = self._find_block(tile_block, 'properties')
+            if not id_match or not properties_block:
+                continue
+            properties = {}
+            for name, value in re.findall(r'\[?"?(\w+)"?\]?\s*=\s*(true|false|"[^"]*"|-?[\d.]+)', properties_block):
+                properties[name] = self._lua_value(value)
+            if properties:
+                tiles[int(id_match.group(1))] = properties
+        return tiles
+
+    def _parse_tsx(self, map_dir, filename):
+        """Свойства тайлов внешнего тайлсета (.tsx): {локальный id: {имя: значение}}"""
+        path = os.path.join(map_dir, filename)
+        if not os.path.exists(path):
+            # Файлы ассетов переименованы без пробелов, а в карте осталось старое имя
+            path = os.path.join(map_dir, filename.replace(' ', ''))
+        try:
+            root = ET.parse(path).getroot()
+        except (OSError, ET.ParseError) as e:
+            print(f"Ошибка загрузки тайлсета {filename}: {e}")
+            return {}
+        tiles = {}
+        for tile in root.iter('tile'):
+            properties = {}
+            for prop in tile.iter('property'):
+                value = prop.get('value', '')
+                if prop.get('type') == 'bool':
+                    value = value == 'true'
+                elif prop.get('type') in ('int', 'float'):
+                    value = self._lua_value(value)
+                properties[prop.get('name')] = value
+            if properties:
+                tiles[int(tile.get('id'))] = properties
+        return tiles
+
+    def _lua_value(self, value):
+        if value in ('true', 'false'):
+            return value == 'true'
+        if value.startswith('"'):
+            return value[1:-1]
+        return float(value) if '.' in value else int(value)
+
     def _simple_lua_parser(self, content):
         """Простой парсер для Lua таблиц (Tiled)"""
         result = {}
@@ -129,9 +219,10 @@ class LuaMapLoader:
         # Извлекаем блок layers
         layers_block = self._find_layers_block(content)
         print(f"DEBUG: Длина блока layers: {len(layers_block)}")
-        # Извлекаем слои только из блока layers
+        # Извлекаем слои только из блока layers (без его внешних скобок, иначе
+        # весь блок считался бы одним слоем)
         layers = []
-        tilelayer_blocks = self._find_tilelayer_blocks(layers_block)
+        tilelayer_blocks = self._find_tilelayer_blocks(layers_block[1:-1])
         print(f"DEBUG: Найдено блоков tilelayer: {len(tilelayer_blocks)}")
         for i, layer_block in enumerate(tilelayer_blocks):
             print(f"DEBUG: block {i} start: {layer_block[:80]} ...")
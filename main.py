@@ -1,17 +1,44 @@
-import pygame
+import os
+import gc
 import sys
+import time
+import argparse
+import pygame
 import random
 import math
 from settings import *
 from player import Player
-from enemy import BasicEnemy, FastEnemy, StrongEnemy, BossEnemy, FoxEnemy, BlackFoxEnemy, RedFoxEnemy, BoarEnemy, ChickenEnemy, CowEnemy, LamaEnemy, PigEnemy, SheepEnemy
+from enemy import DamageNumber, Enemy
 from map import Map
 from camera import Camera
 from attack import Attack, PiercingCarrot, LightningAttack
 from utils import draw_health_bar
 from upgrade_system import UpgradeManager
 from experience_orb import ExperienceOrb, Carrot
-from sound_settings import apply_volume_to_sounds, get_effects_volume, get_volume_multiplier
+from sound_settings import apply_volume_to_sounds, get_effects_volume
+from spatial_hash import SpatialHash
+from flow_field import FlowField
+from pickups import PickupSystem
+from damage_queue import DamageQueue
+from event_bus import EventBus, KillEvent
+from spawn_director import SpawnDirector
+import enemy_engine
+import sound_bank
+from game_clock import GameClock
+from scheduler import Scheduler
+from controls import FrameInput, KeyboardMouseInput, BOTS
+import replay
+from frame_profiler import FrameProfiler
+from hud import Hud
+from text_cache import render_text
+from object_pool import recycle_pools, clear_pools
+
+# Режим без окна для быстрых прогонов: python main.py --headless --frames N --seed S
+HEADLESS = '--headless' in sys.argv
+if HEADLESS:
+    # Окно и звук SDL подменяются пустыми драйверами; set_mode всё равно нужен для convert()
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
 
 pygame.init()
 pygame.mixer.init()  # Инициализация звуковой системы
@@ -20,7 +47,6 @@ fullscreen = False
 # Surface for the game field
 GAME_SIZE = (WIDTH, HEIGHT)
 game_surface = pygame.Surface(GAME_SIZE)
-font_fps = pygame.font.SysFont(None, 24)
 
 # Загрузка изображений меню
 try:
@@ -46,13 +72,11 @@ except pygame.error as e:
     menu_back_btn = pygame.Surface((200, 60))
     menu_back_btn.fill((100, 100, 100))
 
-# Загрузка звука наведения на кнопки меню
-try:
-    menu_hover_sound = pygame.mixer.Sound("assets/sounds/menu_hover_sound.wav")
-    menu_hover_sound.set_volume(0.3)
-except pygame.error as e:
-    print(f"Ошибка загрузки звука наведения меню: {e}")
-    menu_hover_sound = None
+# Декодируем все звуковые эффекты один раз при запуске (без окна звук выключен)
+if HEADLESS:
+    sound_bank.set_enabled(False)
+else:
+    sound_bank.preload()
 
 # Масштабирование изображений под размер экрана
 def scale_menu_images():
@@ -215,11 +239,7 @@ class MenuManager:
         
         # Воспроизводим звук при наведении на новую кнопку
         if current_hovered != self.last_hovered_button and current_hovered is not None:
-            if menu_hover_sound:
-                # Применяем коэффициент громкости
-                volume_multiplier = get_volume_multiplier()
-                menu_hover_sound.set_volume(0.3 * volume_multiplier)
-                menu_hover_sound.play()
+            sound_bank.play("menu_hover")
         
         self.last_hovered_button = current_hovered
         self.hovered_button = current_hovered
@@ -240,11 +260,8 @@ class MenuManager:
             new_back_hovered = back_rect.collidepoint(adjusted_pos)
             if new_back_hovered != self.back_button_hovered:
                 self.back_button_hovered = new_back_hovered
-                if new_back_hovered and menu_hover_sound:
-                    # Применяем коэффициент громкости
-                    volume_multiplier = get_volume_multiplier()
-                    menu_hover_sound.set_volume(0.3 * volume_multiplier)
-                    menu_hover_sound.play()
+                if new_back_hovered:
+                    sound_bank.play("menu_hover")
             
             if self.dragging_slider:
                 # Обновляем громкость на основе позиции мыши
@@ -305,14 +322,12 @@ class MenuManager:
         surface.blit(overlay, (0, 0))
         
         # Заголовок настроек
-        font = pygame.font.SysFont(None, 60)
-        title = font.render('НАСТРОЙКИ', True, (255, 255, 255))
+        title = render_text('НАСТРОЙКИ', 60, (255, 255, 255))
         title_rect = title.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 100))
         surface.blit(title, title_rect)
         
         # Громкость эффектов
-        font_small = pygame.font.SysFont(None, 36)
-        volume_text = font_small.render('Громкость эффектов:', True, (255, 255, 255))
+        volume_text = render_text('Громкость эффектов:', 36, (255, 255, 255))
         volume_rect = volume_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
         surface.blit(volume_text, volume_rect)
         
@@ -331,7 +346,7 @@ class MenuManager:
         pygame.draw.rect(surface, (200, 200, 200), self.slider_handle_rect, 2)
         
         # Значение громкости
-        volume_value = font_small.render(f'{self.effects_volume_percent}%', True, (255, 255, 255))
+        volume_value = render_text(f'{self.effects_volume_percent}%', 36, (255, 255, 255))
         value_rect = volume_value.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 80))
         surface.blit(volume_value, value_rect)
         
@@ -354,15 +369,23 @@ def toggle_fullscreen():
 clock = pygame.time.Clock()
 
 class Game:
-    def __init__(self):
+    def __init__(self, input_source=None, seed=None, use_enemy_engine=None):
         self.state = 'menu'  # 'menu', 'playing', 'paused', 'game_over'
+        # Источник ввода: клавиатура и мышь, бот или запись (см. controls.py, replay.py)
+        self.input = input_source if input_source is not None else KeyboardMouseInput()
+        # Зерно забега: None — новое случайное зерно при каждом reset_game
+        self.fixed_seed = seed
+        self.use_enemy_engine = USE_ENEMY_ENGINE if use_enemy_engine is None else use_enemy_engine
+        self.spawning_enabled = True  # False — враги не появляются сами (сценарии бенчмарков)
+        self.profiler = FrameProfiler()  # Время фаз кадра, график по F3
+        self.hud = Hud(self)  # Уровень и экран улучшений: перерисовываются только при изменении
         self.menu_manager = MenuManager()  # Новый менеджер меню
+        # События по реальному времени: идут и тогда, когда симуляция стоит (экран улучшений)
+        self.ui_scheduler = Scheduler(pygame.time)
         self.upgrade_manager = UpgradeManager()
         self.fullscreen = fullscreen
         self.screen = screen
         self.reset_game()
-        self.last_spawn_time = pygame.time.get_ticks()
-        self.spawn_interval = 2000  # 2 seconds in milliseconds (раньше было 5000)
         self.spawn_distance = 200  # Distance from player for spawning
         self.notification_text = ""
         self.notification_time = 0
@@ -370,12 +393,29 @@ class Game:
         self.last_level = 1  # Для экрана Game Over
 
     def reset_game(self):
+        # Вся случайность забега идёт через self.rng, поэтому зерно + ввод воспроизводят забег
+        self.seed = self.fixed_seed if self.fixed_seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+        self.sim_clock = GameClock()  # Игровое время считается в шагах симуляции
+        self.scheduler = Scheduler(self.sim_clock)  # Таймеры и перезарядки по игровому времени
+        self.frame_input = FrameInput()
         self.all_sprites = pygame.sprite.Group()
         self.enemies = pygame.sprite.Group()
+        self.enemy_grid = SpatialHash(ENEMY_GRID_CELL_SIZE)  # Пространственный индекс врагов
+        # Векторизованная симуляция врагов (None — враги двигаются сами в Enemy.update)
+        if self.use_enemy_engine and enemy_engine.available():
+            self.enemy_engine = enemy_engine.EnemyEngine(self)
+        else:
+            self.enemy_engine = None
         self.experience_orbs = pygame.sprite.Group()  # Новая группа для сфер опыта
         self.carrots = pygame.sprite.Group()  # Группа для морковок
+        self.pickups = PickupSystem(self)  # Слияние морковок в стопки и подбор
+        self.events = EventBus()  # События забега (KillEvent и т.п.)
+        self.damage_queue = DamageQueue(self)  # Удары за шаг применяются одним пакетом
+        self.events.subscribe(KillEvent, self.on_enemy_killed)
         # Load map from Lua file
         self.map = Map(self, lua_map_path="assets/map/final_map.lua")
+        self.flow_field = FlowField(self.map)  # Направления к игроку в обход препятствий
         map_width = self.map.width
         map_height = self.map.height
         # Center of the map
@@ -383,113 +423,68 @@ class Game:
         player_y = map_height // 2
         self.player = Player(self, player_x, player_y)
         self.all_sprites.add(self.player)
+        self.events.subscribe(KillEvent, self.player.on_kill_enemy)
         self.camera = Camera(WIDTH, HEIGHT)
+        self.render_camera = Camera(WIDTH, HEIGHT)  # Камера с интерполированным смещением для отрисовки
+        self.prev_positions = {}
+        self.render_alpha = 1.0
         # Убираем создание гремлина при инициализации - враги будут спавниться только через spawn_enemy()
-        self.last_spawn_time = pygame.time.get_ticks()
+        self.spawner = SpawnDirector(self)
         self.camera.update(self.player)
+        self.camera.snap()
+        self.enemies_added = 0
+        self.update_lod_rect()
         # Reset upgrade system
-        self.upgrade_manager = UpgradeManager()
+        self.upgrade_manager = UpgradeManager(self.rng, self.ui_scheduler)
+        self.input.begin_run(self)
+        # Объекты прошлого забега в пулах больше не нужны; всё загруженное сейчас
+        # (карта, кэши картинок) живёт до конца игры — убираем это из обхода сборщика мусора
+        clear_pools()
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
 
     def spawn_enemy(self):
-        # Получаем границы камеры в тайлах
-        cam_left = -self.camera.offset.x // TILE_SIZE
-        cam_top = -self.camera.offset.y // TILE_SIZE
-        cam_right = cam_left + WIDTH // TILE_SIZE
-        cam_bottom = cam_top + HEIGHT // TILE_SIZE
-        # Задаём минимальное и максимальное расстояние от игрока
-        min_dist = max(WIDTH, HEIGHT) // TILE_SIZE // 2 + 1  # чуть за экраном
-        max_dist = min(6, max(self.map.width, self.map.height) // 2)  # не дальше 6 тайлов
-        for _ in range(20):  # 20 попыток найти подходящее место
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(min_dist, max_dist)
-            spawn_x = int(self.player.x // TILE_SIZE + distance * math.cos(angle))
-            spawn_y = int(self.player.y // TILE_SIZE + distance * math.sin(angle))
-            # Проверяем, что враг вне камеры, но в пределах карты
-            if (spawn_x < cam_left or spawn_x > cam_right or spawn_y < cam_top or spawn_y > cam_bottom) and \
-               0 <= spawn_x < self.map.width and 0 <= spawn_y < self.map.height:
-                break
-        else:
-            # Если не нашли — спавним как раньше
-            spawn_x = self.player.x // TILE_SIZE + random.randint(-max_dist, max_dist)
-            spawn_y = self.player.y // TILE_SIZE + random.randint(-max_dist, max_dist)
-            spawn_x = max(0, min(self.map.width - 1, spawn_x))
-            spawn_y = max(0, min(self.map.height - 1, spawn_y))
-        # Выбираем тип врага в зависимости от уровня
-        level = self.upgrade_manager.level
-        if level == 1:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0)]  # Коровы в начале
-        elif level == 2:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1)]
-        elif level == 3 or level == 4:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), FoxEnemy, SheepEnemy]
-        elif level == 5:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), FoxEnemy, SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy]
-        elif level == 6:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), FoxEnemy, SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy, RedFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 2)]
-        elif level == 7:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), FoxEnemy, SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy, RedFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 2), BlackFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 1), lambda g, x, y: LamaEnemy(g, x, y, 0)]
-        elif level == 8:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), FoxEnemy, SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy, RedFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 2), BlackFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 1), lambda g, x, y: LamaEnemy(g, x, y, 0), lambda g, x, y: LamaEnemy(g, x, y, 2)]
-        elif level == 9:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), FoxEnemy, SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy, RedFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 2), BlackFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 1), lambda g, x, y: LamaEnemy(g, x, y, 0), lambda g, x, y: LamaEnemy(g, x, y, 2), lambda g, x, y: LamaEnemy(g, x, y, 1)]
-        elif level == 10:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), FoxEnemy, SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy, RedFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 2), BlackFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 1), lambda g, x, y: LamaEnemy(g, x, y, 0), lambda g, x, y: LamaEnemy(g, x, y, 2), lambda g, x, y: LamaEnemy(g, x, y, 1)]
-        elif level == 11:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), FoxEnemy, SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy, RedFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 2), BlackFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 1), lambda g, x, y: LamaEnemy(g, x, y, 0), lambda g, x, y: LamaEnemy(g, x, y, 2), lambda g, x, y: LamaEnemy(g, x, y, 1), lambda g, x, y: BoarEnemy(g, x, y, 0)]
-        elif level == 12:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), FoxEnemy, SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy, RedFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 2), BlackFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 1), lambda g, x, y: LamaEnemy(g, x, y, 0), lambda g, x, y: LamaEnemy(g, x, y, 2), lambda g, x, y: LamaEnemy(g, x, y, 1), lambda g, x, y: BoarEnemy(g, x, y, 0)]
-        elif level == 13:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), FoxEnemy, SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy, RedFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 2), BlackFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 1), lambda g, x, y: LamaEnemy(g, x, y, 0), lambda g, x, y: LamaEnemy(g, x, y, 2), lambda g, x, y: LamaEnemy(g, x, y, 1), lambda g, x, y: BoarEnemy(g, x, y, 0), lambda g, x, y: BoarEnemy(g, x, y, 1), lambda g, x, y: BoarEnemy(g, x, y, 2)]
-        elif level == 14:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy, RedFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 2), BlackFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 1), lambda g, x, y: LamaEnemy(g, x, y, 0), lambda g, x, y: LamaEnemy(g, x, y, 2), lambda g, x, y: LamaEnemy(g, x, y, 1), lambda g, x, y: BoarEnemy(g, x, y, 0), lambda g, x, y: BoarEnemy(g, x, y, 1), lambda g, x, y: BoarEnemy(g, x, y, 2)]
-        elif level == 15:
-            enemy_types = [lambda g, x, y: CowEnemy(g, x, y, 0), lambda g, x, y: CowEnemy(g, x, y, 1), lambda g, x, y: CowEnemy(g, x, y, 2), SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy, RedFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 2), BlackFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 1), lambda g, x, y: LamaEnemy(g, x, y, 0), lambda g, x, y: LamaEnemy(g, x, y, 2), lambda g, x, y: LamaEnemy(g, x, y, 1), lambda g, x, y: BoarEnemy(g, x, y, 0), lambda g, x, y: BoarEnemy(g, x, y, 1), lambda g, x, y: BoarEnemy(g, x, y, 2)]
-        elif level == 16:
-            # Начинаем добавлять сильных гремлинов
-            enemy_types = [BasicEnemy, FastEnemy, SheepEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 0), PigEnemy, RedFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 2), BlackFoxEnemy, lambda g, x, y: ChickenEnemy(g, x, y, 1), lambda g, x, y: LamaEnemy(g, x, y, 0), lambda g, x, y: LamaEnemy(g, x, y, 2), lambda g, x, y: LamaEnemy(g, x, y, 1), lambda g, x, y: BoarEnemy(g, x, y, 0), lambda g, x, y: BoarEnemy(g, x, y, 1), lambda g, x, y: BoarEnemy(g, x, y, 2)]
-        else:
-            # Добавляем курицу (три варианта) в пул врагов
-            enemy_types = [BasicEnemy, FastEnemy, StrongEnemy, FoxEnemy, BlackFoxEnemy, RedFoxEnemy,
-                          lambda g, x, y: ChickenEnemy(g, x, y, 0),
-                          lambda g, x, y: ChickenEnemy(g, x, y, 1),
-                          lambda g, x, y: ChickenEnemy(g, x, y, 2),
-                          lambda g, x, y: LamaEnemy(g, x, y, 0),  # обычная лама
-                          lambda g, x, y: LamaEnemy(g, x, y, 1),  # тёмная лама
-                          lambda g, x, y: LamaEnemy(g, x, y, 2),  # красная лама
-                          PigEnemy,  # свинья
-                          SheepEnemy]  # овца
-        enemy_class = random.choice(enemy_types)
-        # Если enemy_class — функция (лямбда для ChickenEnemy), вызываем её, иначе создаём как обычно
-        if callable(enemy_class) and not isinstance(enemy_class, type):
-            enemy = enemy_class(self, spawn_x, spawn_y)
-        else:
-            enemy = enemy_class(self, spawn_x, spawn_y)
+        """Выпускает одного врага за экраном по таблице текущего уровня (см. SpawnDirector)"""
+        return self.spawner.spawn()
+
+    def add_enemy(self, enemy):
+        """Регистрирует врага в группах спрайтов и в пространственной сетке"""
+        # Далёкие враги обновляются по очереди, а не все в одном кадре
+        enemy.lod_phase = self.enemies_added % ENEMY_LOD_INTERVAL
+        self.enemies_added += 1
         self.all_sprites.add(enemy)
         self.enemies.add(enemy)
+        self.enemy_grid.insert(enemy)
+        if self.enemy_engine is not None:
+            self.enemy_engine.add(enemy)
+
+    def on_enemy_killed(self, event):
+        """Подписчик KillEvent: босс появляется по счётчику убийств прокачки"""
+        if self.upgrade_manager.on_enemy_killed() == "spawn_boss":
+            self.spawn_boss()
 
     def spawn_boss(self):
         """Spawns the boss at level 5"""
         # Generate boss position (further from player)
-        angle = random.uniform(0, 2 * 3.14159)
+        angle = self.rng.uniform(0, 2 * 3.14159)
         distance = self.spawn_distance * 1.5
         spawn_x = self.player.x + distance * math.cos(angle)
         spawn_y = self.player.y + distance * math.sin(angle)
-        boss = BossEnemy(self, spawn_x // TILE_SIZE, spawn_y // TILE_SIZE)
-        self.all_sprites.add(boss)
-        self.enemies.add(boss)
+        boss = Enemy.acquire(self, spawn_x // TILE_SIZE, spawn_y // TILE_SIZE, "boss")
+        self.add_enemy(boss)
         # Show notification about boss appearance
         self.show_notification("ПОЯВИЛСЯ БОСС!")
 
     def show_notification(self, text):
         """Shows notification on the screen"""
         self.notification_text = text
-        self.notification_time = pygame.time.get_ticks()
+        self.notification_time = self.sim_clock.get_ticks()
 
     def draw_notification(self, screen):
         """Draws notification"""
-        if self.notification_text and pygame.time.get_ticks() - self.notification_time < self.notification_duration:
-            font = pygame.font.SysFont(None, 36)
-            text_surface = font.render(self.notification_text, True, (255, 0, 0))
+        if self.notification_text and self.sim_clock.get_ticks() - self.notification_time < self.notification_duration:
+            text_surface = render_text(self.notification_text, 36, (255, 0, 0))
             text_rect = text_surface.get_rect(center=(WIDTH // 2, 100))
             bg_rect = text_rect.inflate(20, 10)
             pygame.draw.rect(screen, (0, 0, 0), bg_rect)
@@ -504,9 +499,27 @@ class Game:
         scale_h = screen_h / HEIGHT
         return min(scale_w, scale_h)
 
+    def screen_to_world(self, pos):
+        """Переводит координаты окна (с учётом полноэкранного масштаба) в мировые"""
+        scale = self.get_scale() if self.fullscreen else 1.0
+        surf_rect = pygame.Rect(0, 0, int(WIDTH * scale), int(HEIGHT * scale))
+        surf_rect.center = self.screen.get_rect().center
+        # Координаты игрового поля, затем мировые
+        rel_x = (pos[0] - surf_rect.x) / scale
+        rel_y = (pos[1] - surf_rect.y) / scale
+        return (rel_x - self.camera.offset.x, rel_y - self.camera.offset.y)
+
+    def select_upgrade(self, index):
+        """Выбирает улучшение с экрана повышения уровня и применяет его к игроку"""
+        if index is None or not self.upgrade_manager.showing_upgrade_screen:
+            return
+        selected_upgrade = self.upgrade_manager.select_upgrade(index)
+        if selected_upgrade:
+            self.upgrade_manager.apply_upgrade_to_player(self.player, selected_upgrade)
+
     def draw_fps(self, surface, clock):
         fps = int(clock.get_fps())
-        fps_text = font_fps.render(f"FPS: {fps}", True, (255,255,0))
+        fps_text = render_text(f"FPS: {fps}", 24, (255,255,0))
         surface.blit(fps_text, (surface.get_width() - fps_text.get_width() - 10, 10))
 
     def draw_game_over_screen(self, surface):
@@ -515,22 +528,168 @@ class Game:
         s.set_alpha(200)
         s.fill((0, 0, 0))
         surface.blit(s, (0, 0))
-        font = pygame.font.SysFont(None, 80)
-        text = font.render('ИГРА ОКОНЧЕНА', True, (255, 50, 50))
+        text = render_text('ИГРА ОКОНЧЕНА', 80, (255, 50, 50))
         surface.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2 - 100))
-        font2 = pygame.font.SysFont(None, 48)
-        level_text = font2.render(f'Достигнут уровень: {self.last_level}', True, (255, 255, 255))
+        level_text = render_text(f'Достигнут уровень: {self.last_level}', 48, (255, 255, 255))
         surface.blit(level_text, (WIDTH // 2 - level_text.get_width() // 2, HEIGHT // 2))
-        font3 = pygame.font.SysFont(None, 36)
-        info_text = font3.render('Нажмите ENTER для возврата в меню', True, (200, 200, 200))
+        info_text = render_text('Нажмите ENTER для возврата в меню', 36, (200, 200, 200))
         surface.blit(info_text, (WIDTH // 2 - info_text.get_width() // 2, HEIGHT // 2 + 80))
         # This screen appears after the player dies
         # Shows the reached level and instruction to return to menu
 
+    def update_lod_rect(self):
+        """Область (экран + запас), внутри которой враги обновляются каждый шаг"""
+        view_rect = pygame.Rect(-self.camera.offset.x, -self.camera.offset.y, WIDTH, HEIGHT)
+        self.lod_rect = view_rect.inflate(2 * ENEMY_LOD_MARGIN, 2 * ENEMY_LOD_MARGIN)
+
+    def snapshot_positions(self):
+        """Запоминает позиции спрайтов перед шагом симуляции (для интерполяции)"""
+        self.prev_positions = {sprite: sprite.rect.topleft for sprite in self.all_sprites}
+
+    def render_rect(self, sprite):
+        """Мировой rect спрайта, интерполированный между двумя последними шагами"""
+        rect = sprite.rect
+        prev = self.prev_positions.get(sprite)
+        if prev is None or self.render_alpha >= 1.0:
+            return rect
+        t = 1.0 - self.render_alpha
+        return rect.move(round((prev[0] - rect.x) * t), round((prev[1] - rect.y) * t))
+
+    def step(self):
+        """Один шаг симуляции фиксированной длины SIM_DT"""
+        profiler = self.profiler
+        profiler.mark("other")
+        self.frame_input = self.input.poll(self)
+        self.sim_clock.tick()
+        self.scheduler.run_due()  # Наступившие таймеры: перезарядки способностей, вспышки
+        self.update_lod_rect()
+        self.snapshot_positions()
+        # Обновляем игрока отдельно, чтобы получить отложенную атаку
+        delayed_attack = self.player.update()
+        if delayed_attack:
+            self.all_sprites.add(delayed_attack)
+        profiler.mark("player")
+        self.flow_field.update(*self.player.rect.center)
+        # Движение всех врагов одним векторным шагом
+        if self.enemy_engine is not None:
+            self.enemy_engine.step(self.sim_clock.get_ticks())
+        
+        # Обновляем остальные спрайты
+        for sprite in self.all_sprites:
+            if sprite != self.player:
+                sprite.update()
+        self.experience_orbs.update()
+        # Урон всех источников за шаг: смерти, добыча, числа урона и события убийств
+        self.damage_queue.resolve()
+        self.pickups.collect()
+        profiler.mark("sprites")
+        # Enemy spawn: interval decreases with level, не больше SPAWN_BUDGET_PER_STEP за шаг
+        if self.spawning_enabled:
+            self.spawner.update(self.sim_clock.get_ticks())
+        profiler.mark("spawning")
+
+        self.camera.update(self.player)
+
+        # Check player death
+        if self.player.health <= 0:
+            self.last_level = self.upgrade_manager.level
+            self.state = 'game_over'
+            return
+
+        # --- Новый блок: обработка сбора сфер ---
+        collected = pygame.sprite.spritecollide(self.player, self.experience_orbs, dokill=True)  # type: ignore
+        for orb in collected:
+            self.upgrade_manager.on_experience_orb_collected()
+        # Убитые за шаг морковки, числа урона, атаки и враги становятся доступны для повторного использования
+        recycle_pools()
+        profiler.mark("other")
+
+    def render(self, alpha):
+        """Отрисовка кадра; alpha — доля времени между предыдущим и текущим шагом"""
+        self.render_alpha = alpha
+        profiler = self.profiler
+        camera = self.render_camera
+        camera.offset = self.camera.prev_offset.lerp(self.camera.offset, alpha)
+
+        # Draw everything on game_surface
+        game_surface.fill((0, 0, 0))
+        # Map (optimized: blit pre-rendered chunks, not individual tiles)
+        self.map.draw(game_surface, camera)
+        profiler.mark("map_draw")
+        # Теперь — experience orbs (поверх карты, под врагами и игроком)
+        for orb in self.experience_orbs:
+            game_surface.blit(orb.image, camera.apply(orb))
+        # Отрисовка морковок
+        view_rect = pygame.Rect(-camera.offset.x, -camera.offset.y, WIDTH, HEIGHT)
+        for carrot in self.pickups.visible(view_rect):
+            game_surface.blit(carrot.image, camera.apply(carrot))
+        # Sprites (позиции интерполированы между двумя последними шагами)
+        for sprite in self.all_sprites:
+            if sprite is not self.player:
+                game_surface.blit(sprite.image, camera.apply_rect(self.render_rect(sprite)))
+        self.player.draw(game_surface, camera)
+        profiler.mark("sprite_draw")
+        # UI
+        self.hud.draw(game_surface)
+        self.draw_notification(game_surface)
+        # Menu
+        if self.state == 'menu':
+            self.menu_manager.draw(game_surface)
+        # Pause overlay
+        if self.state == 'paused':
+            s = pygame.Surface(GAME_SIZE)
+            s.set_alpha(180)
+            s.fill((30, 30, 30))
+            game_surface.blit(s, (0, 0))
+            text = render_text('ПАУЗА', 80, (255, 255, 255))
+            game_surface.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2 - 40))
+            # Controls in pause
+            pause_ctrls = [
+                'P — продолжить',
+                'F11 — полноэкранный режим',
+                'F3 — время фаз кадра',
+                'ESC — выйти'
+            ]
+            for i, ctrl in enumerate(pause_ctrls):
+                ctrl_text = render_text(ctrl, 32, (200, 200, 200))
+                game_surface.blit(ctrl_text, (WIDTH // 2 - ctrl_text.get_width() // 2, HEIGHT // 2 + 60 + i * 32))
+        # Game Over overlay
+        if self.state == 'game_over':
+            self.draw_game_over_screen(game_surface)
+        # Профилировщик кадра (F3)
+        if profiler.visible:
+            self.draw_fps(game_surface, clock)
+            profiler.draw(game_surface, self.profiler_counts)
+        profiler.mark("ui")
+        # Scale and center the final surface
+        scale = self.get_scale() if fullscreen else 1.0
+        scaled_surface = pygame.transform.scale(game_surface, (int(WIDTH * scale), int(HEIGHT * scale)))
+        screen.fill((0, 0, 0))
+        screen_rect = screen.get_rect()
+        surf_rect = scaled_surface.get_rect(center=screen_rect.center)
+        screen.blit(scaled_surface, surf_rect)
+        profiler.mark("scale")
+        pygame.display.flip()
+        profiler.mark("flip")
+
+    def profiler_counts(self):
+        """Живые счётчики для оверлея профилировщика"""
+        damage_numbers = sum(1 for sprite in self.all_sprites if isinstance(sprite, DamageNumber))
+        return {
+            "enemies": len(self.enemies),
+            "carrots": len(self.carrots),
+            "all_sprites": len(self.all_sprites),
+            "damage_numbers": damage_numbers,
+        }
+
     def run(self):
         running = True
+        accumulator = 0.0
         while running:
-            dt = clock.tick(60) / 1000
+            # Реальное время кадра (ограничено, чтобы не «догонять» долгие подвисания)
+            frame_time = min(clock.tick(RENDER_FPS) / 1000, MAX_FRAME_TIME)
+            self.profiler.begin_frame()
+            self.ui_scheduler.run_due()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
@@ -539,6 +698,8 @@ class Game:
                         toggle_fullscreen()
                         self.fullscreen = fullscreen
                         self.screen = screen
+                    if event.key == pygame.K_F3:
+                        self.profiler.toggle()
                     if event.key == pygame.K_p:
                         if self.state == 'playing':
                             self.state = 'paused'
@@ -560,23 +721,17 @@ class Game:
                 elif self.state == 'playing':
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_SPACE:
-                            self.player.attack()  # Атака будет создана с задержкой в update()
+                            self.input.request_attack()  # Атака попадёт в ввод следующего шага
                         # Handle upgrade selection
                         if self.upgrade_manager.showing_upgrade_screen:
                             if event.key == pygame.K_1:
-                                selected_upgrade = self.upgrade_manager.select_upgrade(0)
-                                if selected_upgrade:
-                                    self.upgrade_manager.apply_upgrade_to_player(self.player, selected_upgrade)
+                                self.input.request_upgrade(0)
                             elif event.key == pygame.K_2:
-                                selected_upgrade = self.upgrade_manager.select_upgrade(1)
-                                if selected_upgrade:
-                                    self.upgrade_manager.apply_upgrade_to_player(self.player, selected_upgrade)
+                                self.input.request_upgrade(1)
                             elif event.key == pygame.K_3:
-                                selected_upgrade = self.upgrade_manager.select_upgrade(2)
-                                if selected_upgrade:
-                                    self.upgrade_manager.apply_upgrade_to_player(self.player, selected_upgrade)
+                                self.input.request_upgrade(2)
                     if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                        self.player.attack()  # Атака будет создана с задержкой в update()
+                        self.input.request_attack()  # Атака попадёт в ввод следующего шага
                 elif self.state == 'paused':
                     # В паузе можно только выйти из паузы (по P)
                     pass
@@ -584,112 +739,100 @@ class Game:
                     if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
                         self.state = 'menu'
 
-            # --- ALWAYS update and draw the scene ---
-            if self.state == 'playing' and not self.upgrade_manager.showing_upgrade_screen:
-                # Обновляем игрока отдельно, чтобы получить отложенную атаку
-                delayed_attack = self.player.update()
-                if delayed_attack:
-                    self.all_sprites.add(delayed_attack)
-                
-                # Обновляем остальные спрайты
-                for sprite in self.all_sprites:
-                    if sprite != self.player:
-                        sprite.update()
-                self.experience_orbs.update()
-                self.carrots.update()
-                # Enemy spawn: interval decreases with level
-                current_time = pygame.time.get_ticks()
-                # Новый интервал: минимум 300 мс, быстрее уменьшается с уровнем
-                level = self.upgrade_manager.level
-                self.spawn_interval = max(300, 2000 - (level - 1) * 200)
-                if current_time - self.last_spawn_time > self.spawn_interval:
-                    self.spawn_enemy()
-                    self.last_spawn_time = current_time
-
-            self.camera.update(self.player)
-
-            # Draw everything on game_surface
-            game_surface.fill((0, 0, 0))
-            # Map (optimized: draw from tile_ids, not sprites)
-            cam_left = -self.camera.offset.x
-            cam_top = -self.camera.offset.y
-            cam_right = cam_left + WIDTH
-            cam_bottom = cam_top + HEIGHT
-            tile_left = max(0, int(cam_left // TILE_SIZE) - 1)
-            tile_top = max(0, int(cam_top // TILE_SIZE) - 1)
-            tile_right = min(self.map.width, int(cam_right // TILE_SIZE) + 2)
-            tile_bottom = min(self.map.height, int(cam_bottom // TILE_SIZE) + 2)
-            for y in range(tile_top, tile_bottom):
-                for x in range(tile_left, tile_right):
-                    tile_id = self.map.get_tile_id(x, y)
-                    if tile_id >= 0:
-                        tile_img = self.map.get_tile_image(tile_id)
-                        tile_rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-                        game_surface.blit(tile_img, self.camera.apply(type('obj', (), {'rect': tile_rect})))
-            # Теперь — experience orbs (поверх карты, под врагами и игроком)
-            for orb in self.experience_orbs:
-                game_surface.blit(orb.image, self.camera.apply(orb))
-            # Отрисовка морковок
-            for carrot in self.carrots:
-                game_surface.blit(carrot.image, self.camera.apply(carrot))
-            # Sprites
-            for sprite in self.all_sprites:
-                if sprite is not self.player:
-                    game_surface.blit(sprite.image, self.camera.apply(sprite))
-            self.player.draw(game_surface, self.camera)
-            # UI
-            self.upgrade_manager.draw_progress(game_surface)
-            self.upgrade_manager.draw_upgrade_screen(game_surface)
-            self.draw_notification(game_surface)
-            # Menu
-            if self.state == 'menu':
-                self.menu_manager.draw(game_surface)
-            # Pause overlay
-            if self.state == 'paused':
-                s = pygame.Surface(GAME_SIZE)
-                s.set_alpha(180)
-                s.fill((30, 30, 30))
-                game_surface.blit(s, (0, 0))
-                font = pygame.font.SysFont(None, 80)
-                text = font.render('ПАУЗА', True, (255, 255, 255))
-                game_surface.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2 - 40))
-                # Controls in pause
-                font_ctrl = pygame.font.SysFont(None, 32)
-                pause_ctrls = [
-                    'P — продолжить',
-                    'F11 — полноэкранный режим',
-                    'ESC — выйти'
-                ]
-                for i, ctrl in enumerate(pause_ctrls):
-                    ctrl_text = font_ctrl.render(ctrl, True, (200, 200, 200))
-                    game_surface.blit(ctrl_text, (WIDTH // 2 - ctrl_text.get_width() // 2, HEIGHT // 2 + 60 + i * 32))
-            # Game Over overlay
-            if self.state == 'game_over':
-                self.draw_game_over_screen(game_surface)
-            # Scale and center the final surface
-            scale = self.get_scale() if fullscreen else 1.0
-            scaled_surface = pygame.transform.scale(game_surface, (int(WIDTH * scale), int(HEIGHT * scale)))
-            screen.fill((0, 0, 0))
-            screen_rect = screen.get_rect()
-            surf_rect = scaled_surface.get_rect(center=screen_rect.center)
-            screen.blit(scaled_surface, surf_rect)
-            pygame.display.flip()
-
-            # Check player death
-            if self.state == 'playing' and self.player.health <= 0:
-                self.last_level = self.upgrade_manager.level
-                self.state = 'game_over'
-
-            # --- Новый блок: обработка сбора сфер ---
+            self.profiler.mark("events")
+
+            # Выбор улучшения (клавиши 1-3 или бот)
+            if self.state == 'playing' and self.upgrade_manager.showing_upgrade_screen:
+                self.select_upgrade(self.input.choose_upgrade(self))
+
+            # --- Fixed-step simulation: столько шагов SIM_DT, сколько накопилось времени ---
             if self.state == 'playing' and not self.upgrade_manager.showing_upgrade_screen:
-                collected = pygame.sprite.spritecollide(self.player, self.experience_orbs, dokill=True)  # type: ignore
-                for orb in collected:
-                    self.upgrade_manager.on_experience_orb_collected()
+                accumulator += frame_time
+                steps = 0
+                while (accumulator >= SIM_DT and steps < MAX_SIM_STEPS_PER_FRAME and
+                       self.state == 'playing' and not self.upgrade_manager.showing_upgrade_screen):
+                    self.step()
+                    accumulator -= SIM_DT
+                    steps += 1
+                # Если не успеваем — отбрасываем хвост, а не копим отставание
+                accumulator = min(accumulator, SIM_DT)
+                alpha = accumulator / SIM_DT
+            else:
+                accumulator = 0.0
+                alpha = 1.0
+
+            # --- ALWAYS draw the scene ---
+            self.render(alpha)
 
+    def run_headless(self, frames):
+        """Прогон frames шагов симуляции без отрисовки и без ограничения FPS"""
+        # Забег только что подготовлен в __init__ — второй раз карту не грузим
+        if self.sim_clock.frame or self.state != 'menu':
+            self.reset_game()
+        self.state = 'playing'
+        steps = 0
+        start = time.perf_counter()
+        while steps < frames and self.state == 'playing':
+            self.ui_scheduler.run_due()
+            if self.upgrade_manager.showing_upgrade_screen:
+                self.select_upgrade(self.input.choose_upgrade(self))
+                continue
+            self.step()
+            steps += 1
+        elapsed = time.perf_counter() - start
+        return {
+            "frames": steps,
+            "seconds": elapsed,
+            "steps_per_second": steps / elapsed if elapsed > 0 else 0.0,
+            "game_time_ms": self.sim_clock.get_ticks(),
+            "level": self.upgrade_manager.level,
+            "enemies": len(self.enemies),
+            "health": self.player.health,
+            "game_over": self.state == 'game_over',
+            "state_hash": replay.state_hash(self).hex(),
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bunny roguelike")
+    parser.add_argument("--headless", action="store_true", help="симуляция без окна и звука")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="число шагов в режиме --headless (по умолчанию 3600 или вся запись)")
+    parser.add_argument("--seed", type=int, default=None, help="зерно генератора случайных чисел")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="kite", help="бот, управляющий игроком без окна")
+    parser.add_argument("--record", metavar="PATH", help="записать ввод забега в файл")
+    parser.add_argument("--replay", metavar="PATH", help="воспроизвести записанный забег")
+    return parser.parse_args(argv)
 
 
 if __name__ == '__main__':
-    game = Game()
-    game.run()
+    args = parse_args()
+    use_enemy_engine = None
+    if args.replay:
+        source = replay.ReplayInput(args.replay)
+        seed = source.seed
+        use_enemy_engine = source.use_enemy_engine
+    elif args.headless:
+        source = BOTS[args.bot](args.seed)
+        seed = args.seed
+    else:
+        source = KeyboardMouseInput()
+        seed = args.seed
+    if args.record:
+        source = replay.Recorder(source, args.record)
+    game = Game(source, seed=seed, use_enemy_engine=use_enemy_engine)
+    if args.headless:
+        frames = args.frames
+        if frames is None:
+            frames = source.frame_count if args.replay else 3600
+        summary = game.run_headless(frames)
+        print(f"Шагов: {summary['frames']} за {summary['seconds']:.2f} с "
+              f"({summary['steps_per_second']:.0f} шагов/с), уровень {summary['level']}, "
+              f"врагов {summary['enemies']}, здоровье {summary['health']}, хэш {summary['state_hash']}")
+        if args.replay and not source.divergences:
+            print("Воспроизведение совпало с записью")
+    else:
+        game.run()
+    source.close()
     pygame.quit()
     sys.exit()
\ No newline at end of file
@@ -2,8 +2,18 @@ import pygame
 from settings import *
 from tilemap import load_tilemap
 from lua_map_loader import LuaMapLoader
+from collections import OrderedDict
 import os
 
+# Размер чанка предварительно отрисованной карты (в тайлах)
+CHUNK_TILES = 16
+CHUNK_SIZE = CHUNK_TILES * TILE_SIZE
+# Сколько чанков держим в памяти одновременно (LRU)
+MAX_CACHED_CHUNKS = 24
+# Биты ячейки в сетке столкновений (из свойств тайлов solid/water в Tiled)
+SOLID = 1
+WATER = 2
+
 class Tile(pygame.sprite.Sprite):
     def __init__(self, game, x, y, image):
         super().__init__(game.all_sprites)
@@ -18,7 +28,9 @@ class Map:
     def __init__(self, game, level_data=None, tileset_path="assets/map/TXTilesetGrass.png", lua_map_path=None):
         self.game = game
         self.tilemap = load_tilemap(tileset_path)
-        self.tile_ids = []  # двумерный массив tile_id
+        self.tile_ids = []  # двумерный массив tile_id (первый слой, он же рисуется)
+        self.layers = []  # все слои тайлов; столкновения учитывают каждый
+        self.tile_flags = {}  # tile_id -> биты SOLID/WATER из свойств тайлсета
         self.width = 0
         self.height = 0
         if lua_map_path:
@@ -27,8 +39,11 @@ class Map:
             self.load_from_data(level_data)
         else:
             self.create_default_map()
+        self.build_collision()
         # Один экземпляр Tile для отрисовки (не спрайт)
         self._draw_tile = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
+        # Кэш запечённых чанков: (cx, cy) -> Surface, порядок = давность использования
+        self._chunk_cache = OrderedDict()
 
     def load_lua_map(self, lua_map_path):
         loader = LuaMapLoader()
@@ -38,15 +53,20 @@ class Map:
             self.height = map_data['height']
             self.tile_width = map_data['tile_width']
             self.tile_height = map_data['tile_height']
-            # Берём только первый слой
-            if map_data['layers']:
-                self.tile_ids = map_data['layers'][0]['data']
+            self.layers = [layer['data'] for layer in map_data['layers'] if layer['data']]
+            if self.layers:
+                self.tile_ids = self.layers[0]
+            for tile_id, properties in map_data.get('tile_properties', {}).items():
+                flags = (SOLID if properties.get('solid') else 0) | (WATER if properties.get('water') else 0)
+                if flags:
+                    self.tile_flags[tile_id] = flags
         else:
             print("Ошибка загрузки Lua карты, создается карта по умолчанию")
             self.create_default_map()
 
     def load_from_data(self, level_data):
         self.tile_ids = [row[:] for row in level_data]
+        self.layers = [self.tile_ids]
         self.height = len(self.tile_ids)
         self.width = len(self.tile_ids[0]) if self.height > 0 else 0
 
@@ -61,6 +81,30 @@ class Map:
         ]
         self.load_from_data(default_map)
 
+    def build_collision(self):
+        """Собирает сетку столкновений: байт на ячейку, биты SOLID/WATER со всех слоёв"""
+        collision = bytearray(self.width * self.height)
+        if self.tile_flags:
+            tile_flags = self.tile_flags
+            for layer in self.layers:
+                for y, row in enumerate(layer[:self.height]):
+                    base = y * self.width
+                    for x, tile_id in enumerate(row[:self.width]):
+                        flags = tile_flags.get(tile_id)
+                        if flags:
+                            collision[base + x] |= flags
+        self.collision = collision
+        self.has_solid = any(flags & SOLID for flags in collision)
+
+    def _update_cell_flags(self, x, y):
+        flags = 0
+        for layer in self.layers:
+            if y < len(layer) and x < len(layer[y]):
+                flags |= self.tile_flags.get(layer[y][x], 0)
+        self.collision[y * self.width + x] = flags
+        if flags & SOLID:
+            self.has_solid = True
+
     def get_tile_id(self, x, y):
         if 0 <= y < self.height and 0 <= x < self.width:
             return self.tile_ids[y][x]
@@ -77,9 +121,101 @@ class Map:
             surf.fill((255, 0, 255))
             return surf
 
+    def set_tile_id(self, x, y, tile_id):
+        """Меняет тайл и сбрасывает запечённый чанк, в котором он лежит"""
+        if 0 <= y < self.height and 0 <= x < self.width:
+            self.tile_ids[y][x] = tile_id
+            self.invalidate_tile(x, y)
+            self._update_cell_flags(x, y)
+            flow_field = getattr(self.game, 'flow_field', None)
+            if flow_field is not None:
+                flow_field.invalidate()
+
+    def invalidate_tile(self, x, y):
+        """Хук инвалидации: чанк с этим тайлом будет перерисован при следующем показе"""
+        self._chunk_cache.pop((x // CHUNK_TILES, y // CHUNK_TILES), None)
+
+    def invalidate_all_chunks(self):
+        """Сбрасывает все запечённые чанки (например, после загрузки новой карты)"""
+        self._chunk_cache.clear()
+
+    def _render_chunk(self, cx, cy):
+        """Запекает тайлы одного чанка в отдельную поверхность"""
+        tile_left = cx * CHUNK_TILES
+        tile_top = cy * CHUNK_TILES
+        tile_right = min(self.width, tile_left + CHUNK_TILES)
+        tile_bottom = min(self.height, tile_top + CHUNK_TILES)
+        chunk = pygame.Surface(((tile_right - tile_left) * TILE_SIZE, (tile_bottom - tile_top) * TILE_SIZE)).convert()
+        chunk.fill((0, 0, 0))
+        for y in range(tile_top, tile_bottom):
+            row = self.tile_ids[y]
+            for x in range(tile_left, tile_right):
+                tile_id = row[x]
+                if tile_id >= 0:
+                    chunk.blit(self.get_tile_image(tile_id), ((x - tile_left) * TILE_SIZE, (y - tile_top) * TILE_SIZE))
+        return chunk
+
+    def get_chunk(self, cx, cy):
+        """Возвращает запечённый чанк, рисуя его при первом обращении"""
+        key = (cx, cy)
+        chunk = self._chunk_cache.get(key)
+        if chunk is None:
+            chunk = self._render_chunk(cx, cy)
+            self._chunk_cache[key] = chunk
+            if len(self._chunk_cache) > MAX_CACHED_CHUNKS:
+                self._chunk_cache.popitem(last=False)
+        else:
+            self._chunk_cache.move_to_end(key)
+        return chunk
+
+    def draw(self, surface, camera):
+        """Рисует видимую часть карты несколькими блитами чанков"""
+        offset_x = int(camera.offset.x)
+        offset_y = int(camera.offset.y)
+        view_w, view_h = surface.get_size()
+        chunks_x = (self.width + CHUNK_TILES - 1) // CHUNK_TILES
+        chunks_y = (self.height + CHUNK_TILES - 1) // CHUNK_TILES
+        chunk_left = max(0, -offset_x // CHUNK_SIZE)
+        chunk_top = max(0, -offset_y // CHUNK_SIZE)
+        chunk_right = min(chunks_x, (view_w - offset_x) // CHUNK_SIZE + 1)
+        chunk_bottom = min(chunks_y, (view_h - offset_y) // CHUNK_SIZE + 1)
+        for cy in range(chunk_top, chunk_bottom):
+            for cx in range(chunk_left, chunk_right):
+                surface.blit(self.get_chunk(cx, cy), (cx * CHUNK_SIZE + offset_x, cy * CHUNK_SIZE + offset_y))
+
     def is_solid_tile(self, x, y):
-        # Можно добавить отдельную логику для solid-тайлов
+        if 0 <= y < self.height and 0 <= x < self.width:
+            return bool(self.collision[y * self.width + x] & SOLID)
         return False
 
     def is_water_tile(self, x, y):
-        return False
\ No newline at end of file
+        if 0 <= y < self.height and 0 <= x < self.width:
+            return bool(self.collision[y * self.width + x] & WATER)
+        return False
+
+    def rect_blocked(self, x, y, width, height):
+        """True, если прямоугольник (в пикселях) задевает хотя бы один solid-тайл"""
+        left = int(x)
+        top = int(y)
+        tile_left = max(0, left // TILE_SIZE)
+        tile_right = min(self.width - 1, (left + width - 1) // TILE_SIZE)
+        tile_top = max(0, top // TILE_SIZE)
+        tile_bottom = min(self.height - 1, (top + height - 1) // TILE_SIZE)
+        collision = self.collision
+        for ty in range(tile_top, tile_bottom + 1):
+            base = ty * self.width
+            for tx in range(tile_left, tile_right + 1):
+                if collision[base + tx] & SOLID:
+                    return True
+        return False
+
+    def slide(self, old_x, old_y, new_x, new_y, width, height):
+        """Перемещение с раздельной проверкой осей: упёршись в стену по одной оси,
+        объект продолжает скользить вдоль неё по другой. Возвращает итоговые (x, y)"""
+        if not self.has_solid:
+            return new_x, new_y
+        if self.rect_blocked(new_x, old_y, width, height):
+            new_x = old_x
+        if self.rect_blocked(new_x, new_y, width, height):
+            new_y = old_y
+        return new_x, new_y
\ No newline at end of file
@@ -0,0 +1,101 @@
+import pygame
+
+
+class ObjectPool:
+    """Пул переиспользуемых объектов одного класса.
+
+    acquire() берёт свободный экземпляр и заново вызывает у него __init__
+    (для спрайта это снова добавляет его в группы), либо создаёт новый.
+    release() не отдаёт объект сразу: он попадает в свободные только после
+    recycle() в конце шага симуляции, поэтому ссылки на убитый объект,
+    оставшиеся до конца шага, не увидят чужого состояния.
+    """
+
+    def __init__(self, cls, max_free=512):
+        self.cls = cls
+        self.max_free = max_free
+        self.free = []
+        self.released = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            obj = self.free.pop()
+            generation = obj.pool_generation + 1
+            # Чистим атрибуты прошлой жизни (включая добавленные снаружи через setattr)
+            obj.__dict__.clear()
+            obj.__init__(*args, **kwargs)
+            obj.pool_generation = generation
+            self.reused += 1
+        else:
+            obj = self.cls(*args, **kwargs)
+            self.created += 1
+        obj.pool = self
+        obj.in_pool = False
+        return obj
+
+    def release(self, obj):
+        if obj.in_pool:
+            return
+        obj.in_pool = True
+        self.released.append(obj)
+
+    def recycle(self):
+        """Делает отпущенные за шаг объекты доступными для acquire()"""
+        released = self.released
+        if released:
+            room = self.max_free - len(self.free)
+            if room > 0:
+                self.free.extend(released[:room])
+            released.clear()
+
+    def clear(self):
+        self.free.clear()
+        self.released.clear()
+
+
+# Все пулы процесса: класс -> ObjectPool
+_pools = {}
+
+
+def pool_for(cls):
+    pool = _pools.get(cls)
+    if pool is None:
+        pool = ObjectPool(cls)
+        _pools[cls] = pool
+    return pool
+
+
+def recycle_pools():
+    """Вызывается в конце каждого шага симуляции"""
+    for pool in _pools.values():
+        pool.recycle()
+
+
+def clear_pools():
+    """Сбрасывает все пулы (новый забег — объекты прошлой игры больше не нужны)"""
+    for pool in _pools.values():
+        pool.clear()
+
+
+class PooledSprite(pygame.sprite.Sprite):
+    """Спрайт, который после kill() возвращается в пул своего класса.
+
+    Создавайте такие спрайты через Class.acquire(...) — тогда они переиспользуются;
+    созданные обычным конструктором живут и умирают как обычные спрайты.
+    pool_generation растёт при каждом переиспользовании, чтобы долгоживущие
+    ссылки (например, цель молнии) могли заметить, что объект уже другой.
+    """
+    pool = None
+    in_pool = False
+    pool_generation = 0
+
+    @classmethod
+    def acquire(cls, *args, **kwargs):
+        return pool_for(cls).acquire(*args, **kwargs)
+
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
@@ -0,0 +1,73 @@
+from settings import TILE_SIZE
+from spatial_hash import SpatialHash
+from experience_orb import Carrot
+import sound_bank
+
+# Морковки, упавшие ближе этого расстояния (между центрами), сливаются в одну стопку
+PICKUP_MERGE_RADIUS = TILE_SIZE
+# Игрок подбирает всё, чей центр не дальше этого расстояния от его центра
+PICKUP_RADIUS = TILE_SIZE
+
+
+class PickupSystem:
+    """Все лежащие на карте морковки: слияние в стопки, подбор и видимые для отрисовки.
+
+    Морковки не двигаются, поэтому в сетку попадают один раз при падении.
+    Подбор — один запрос к сетке вокруг игрока за шаг и один вызов
+    UpgradeManager на суммарное значение.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.grid = SpatialHash(TILE_SIZE * 2)
+
+    def __len__(self):
+        return len(self.grid)
+
+    def drop(self, x, y, value=1):
+        """Кладёт морковку ценностью value, добавляя её к стопке поблизости, если такая есть"""
+        nearest = None
+        nearest_dist_sq = PICKUP_MERGE_RADIUS * PICKUP_MERGE_RADIUS + 1
+        for carrot in self.grid.query_radius(x, y, PICKUP_MERGE_RADIUS):
+            cx, cy = carrot.rect.center
+            dist_sq = (cx - x) ** 2 + (cy - y) ** 2
+            if dist_sq < nearest_dist_sq:
+                nearest, nearest_dist_sq = carrot, dist_sq
+        if nearest is not None:
+            nearest.add_value(value)
+            self._update_padding(nearest)
+            return nearest
+        carrot = Carrot.acquire(self.game, x, y, value)
+        self.game.carrots.add(carrot)
+        self.grid.insert(carrot)
+        return carrot
+
+    def _update_padding(self, carrot):
+        # Стопка выросла в размере — запросы по прямоугольнику должны её находить
+        half_extent = (max(carrot.rect.width, carrot.rect.height) + 1) // 2
+        if half_extent > self.grid.padding:
+            self.grid.padding = half_extent
+
+    def remove(self, carrot):
+        self.grid.remove(carrot)
+
+    def collect(self):
+        """Подбирает всё в радиусе от игрока; возвращает суммарное значение"""
+        px, py = self.game.player.rect.center
+        collected = self.grid.query_radius(px, py, PICKUP_RADIUS)
+        if not collected:
+            return 0
+        total = 0
+        for carrot in collected:
+            total += carrot.value
+            carrot.kill()
+        sound_bank.play("exp")
+        self.game.upgrade_manager.on_experience_orb_collected(total)
+        return total
+
+    def visible(self, view_rect):
+        """Морковки, которые могут попасть в прямоугольник экрана (в мировых координатах)"""
+        return self.grid.query_rect(view_rect)
+
+    def clear(self):
+        self.grid.clear()
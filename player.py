@@ -1,42 +1,23 @@
 import pygame
 from settings import *
-import random
-from attack import Attack, SwingAttack, PiercingCarrot
+from attack import Attack, SwingAttack, PiercingCarrot, prepare_swing_frames
+from asset_cache import load_image, get_image, get_frames, get_effect
+from hud import HealthBar
 import os
 import math
-from sound_settings import get_volume_multiplier
+import sound_bank
 
 class Player(pygame.sprite.Sprite):
     def __init__(self, game, x, y):
         super().__init__()
         self.game = game
-        # --- Загрузка звука меча ---
-        try:
-            self.sword_sound = pygame.mixer.Sound(os.path.join("assets", "sounds", "sword_sound.mp3"))
-            self.sword_sound.set_volume(0.3)  # Устанавливаем громкость на 30%
-        except:
-            self.sword_sound = None
-            print("Не удалось загрузить звук меча")
-        
-        # --- Загрузка звука ходьбы ---
-        try:
-            self.walk_sound = pygame.mixer.Sound(os.path.join("assets", "sounds", "walk_sound.mp3"))
-            self.walk_sound.set_volume(0.04)  # Устанавливаем громкость на 4%
-        except:
-            self.walk_sound = None
-            print("Не удалось загрузить звук ходьбы")
-        
         # --- Анимация кролика ---
+        # Кадры общие для всех забегов (asset_cache), поэтому и их красные варианты создаются один раз
+        walk_paths = [os.path.join("assets", "bunny", f"bunny_walk{i}.png") for i in (1, 2, 3)]
         # Загружаем кадры анимации ходьбы вправо
-        self.walk_right_frames = [
-            pygame.image.load(os.path.join("assets", "bunny", "bunny_walk1.png")).convert_alpha(),
-            pygame.image.load(os.path.join("assets", "bunny", "bunny_walk2.png")).convert_alpha(),
-            pygame.image.load(os.path.join("assets", "bunny", "bunny_walk3.png")).convert_alpha(),
-        ]
-        # Создаём зеркальные кадры для ходьбы влево
-        self.walk_left_frames = [
-            pygame.transform.flip(frame, True, False) for frame in self.walk_right_frames
-        ]
+        self.walk_right_frames = list(get_frames(walk_paths))
+        # Зеркальные кадры для ходьбы влево
+        self.walk_left_frames = list(get_frames(walk_paths, flip=True))
         # Начальный кадр
         self.image = self.walk_right_frames[0]
         self.rect = self.image.get_rect()
@@ -51,16 +32,11 @@ class Player(pygame.sprite.Sprite):
         self.direction = "right"  # "right" или "left"
         self.is_moving = False
         # --- Анимация атаки ---
+        attack_paths = [os.path.join("assets", "bunny", f"bunny_attack{i}.png") for i in (1, 2, 3)]
         # Загружаем кадры анимации атаки вправо
-        self.attack_frames_right = [
-            pygame.image.load(os.path.join("assets", "bunny", "bunny_attack1.png")).convert_alpha(),
-            pygame.image.load(os.path.join("assets", "bunny", "bunny_attack2.png")).convert_alpha(),
-            pygame.image.load(os.path.join("assets", "bunny", "bunny_attack3.png")).convert_alpha(),
-        ]
-        # Создаём зеркальные кадры для атаки влево
-        self.attack_frames_left = [
-            pygame.transform.flip(frame, True, False) for frame in self.attack_frames_right
-        ]
+        self.attack_frames_right = list(get_frames(attack_paths))
+        # Зеркальные кадры для атаки влево
+        self.attack_frames_left = list(get_frames(attack_paths, flip=True))
         self.is_attacking = False
         self.attack_anim_timer = 0
         self.attack_anim_speed = 0.08  # скорость переключения кадров атаки
@@ -74,6 +50,7 @@ class Player(pygame.sprite.Sprite):
         self.attack_damage = 20
         self.attack_cooldown = 500  # milliseconds
         self.attack_size_multiplier = 2.0  # Было 1.0, теперь радиус атаки в 2 раза больше
+        prepare_swing_frames(self.attack_size_multiplier)
         
         # Special abilities
         self.vampirism = 0
@@ -86,33 +63,35 @@ class Player(pygame.sprite.Sprite):
         
         # --- Magic Carrots ---
         self.magic_carrots_active = False
-        self.magic_carrots_timer = 0
+        self.magic_carrots_timer = None  # цикл «появились — исчезли» в game.scheduler
+        self.magic_carrots_stop_timer = None  # конец текущего появления
         self.magic_carrots_cooldown = 10000  # 10 секунд
         self.magic_carrots_duration = 3000   # 3 секунды
-        self.magic_carrots_last_time = 0
         self.magic_carrots_angle = 0
         self.has_magic_carrots = False
         self.magic_carrots_count = 0  # начальное количество морковок
         self.magic_carrots_image = None
         try:
-            img = pygame.image.load(os.path.join("assets", "blue_carrot.png")).convert_alpha()
-            self.magic_carrots_image = pygame.transform.scale(img, (img.get_width()*2, img.get_height()*2))
+            path = os.path.join("assets", "blue_carrot.png")
+            img = load_image(path)
+            self.magic_carrots_image = get_image(path, (img.get_width()*2, img.get_height()*2))
         except Exception:
             self.magic_carrots_image = pygame.Surface((48, 48), pygame.SRCALPHA)
             pygame.draw.ellipse(self.magic_carrots_image, (80, 180, 255), (0, 0, 48, 24))
         
         # --- Piercing Carrot ---
-        self.piercing_carrot_last_time = 0
+        self.piercing_carrot_timer = None
         self.piercing_carrot_cooldown = 2000  # 2 секунды
         self.piercing_carrot_count = 0  # Счетчик пронзающих морковок
         self.piercing_carrot_image = None
         
         # --- Lightning ---
-        self.lightning_last_time = 0
+        self.lightning_timer = None
         self.lightning_cooldown = 5000  # 5 секунд
         try:
-            img = pygame.image.load(os.path.join("assets", "carrot.png")).convert_alpha()
-            self.piercing_carrot_image = pygame.transform.scale(img, (img.get_width()//2, img.get_height()//2))
+            path = os.path.join("assets", "carrot.png")
+            img = load_image(path)
+            self.piercing_carrot_image = get_image(path, (img.get_width()//2, img.get_height()//2))
         except Exception:
             self.piercing_carrot_image = pygame.Surface((16, 16), pygame.SRCALPHA)
             pygame.draw.ellipse(self.piercing_carrot_image, (150, 150, 150), (0, 0, 16, 8))
@@ -131,9 +110,10 @@ class Player(pygame.sprite.Sprite):
         self.last_walk_sound_time = 0
         
         # --- Система изменения цвета при получении урона ---
-        self.damage_flash_timer = 0
+        self.damage_flash_timer = None
         self.damage_flash_duration = 200  # миллисекунды красного цвета
         self.is_flashing_red = False
+        self.health_bar = HealthBar(self, width=40, height=6)  # перерисовывается при смене здоровья
 
     def move(self, dx=0, dy=0):
         # Новые координаты после перемещения
@@ -147,6 +127,8 @@ class Player(pygame.sprite.Sprite):
         # Ограничиваем координаты, чтобы не выйти за границы карты
         new_x = max(0, min(new_x, map_width - TILE_SIZE))
         new_y = max(0, min(new_y, map_height - TILE_SIZE))
+        # Непроходимые тайлы: каждая ось проверяется отдельно, вдоль стены можно скользить
+        new_x, new_y = self.game.map.slide(self.x, self.y, new_x, new_y, self.rect.width, self.rect.height)
 
         # Устанавливаем новые координаты
         self.x = new_x
@@ -162,16 +144,11 @@ class Player(pygame.sprite.Sprite):
                 self.game.last_level = self.game.upgrade_manager.level
                 self.game.state = 'game_over'
             return
-        keys = pygame.key.get_pressed()
-        dx, dy = 0, 0
-        if keys[pygame.K_w]:
-            dy = -1
-        if keys[pygame.K_s]:
-            dy = 1
-        if keys[pygame.K_a]:
-            dx = -1
-        if keys[pygame.K_d]:
-            dx = 1
+        # Ввод на этот шаг (клавиатура/мышь, бот или запись) собирает Game.step
+        frame_input = self.game.frame_input
+        if frame_input.attack:
+            self.attack()  # Атака будет создана с задержкой ниже
+        dx, dy = frame_input.move_x, frame_input.move_y
         self.is_moving = dx != 0 or dy != 0
         # Определяем направление
         if dx > 0:
@@ -182,19 +159,15 @@ class Player(pygame.sprite.Sprite):
         if self.is_moving:
             self.move(dx, dy)
             # --- Воспроизведение звука ходьбы ---
-            if self.walk_sound:
-                now = pygame.time.get_ticks()
-                if now - self.last_walk_sound_time > self.walk_sound_cooldown:
-                    # Применяем коэффициент громкости
-                    volume_multiplier = get_volume_multiplier()
-                    self.walk_sound.set_volume(0.04 * volume_multiplier)
-                    self.walk_sound.play()
-                    self.last_walk_sound_time = now
+            now = self.game.sim_clock.get_ticks()
+            if now - self.last_walk_sound_time > self.walk_sound_cooldown:
+                sound_bank.play("walk")
+                self.last_walk_sound_time = now
         else:
             # Останавливаем звук ходьбы, если игрок не двигается
             self.walk_sound_playing = False
         # --- Анимация ---
-        dt = 1 / 60  # Предполагаем 60 FPS, если dt не передаётся
+        dt = SIM_DT  # Фиксированный шаг симуляции
         
         # Обработка анимации атаки
         if self.is_attacking:
@@ -224,104 +197,36 @@ class Player(pygame.sprite.Sprite):
             else:
                 self.image = self.walk_left_frames[self.current_frame] if self.is_moving else self.walk_left_frames[0]
         # --- Magic Carrots update ---
-        if self.has_magic_carrots:
-            now = pygame.time.get_ticks()
-            if self.magic_carrots_active:
-                if now - self.magic_carrots_last_time > self.magic_carrots_duration:
-                    self.magic_carrots_active = False
-                    self.magic_carrots_last_time = now
-            else:
-                if now - self.magic_carrots_last_time > self.magic_carrots_cooldown:
-                    self.magic_carrots_active = True
-                    self.magic_carrots_last_time = now
-            if self.magic_carrots_active:
-                self.magic_carrots_angle += 0.12  # скорость вращения
-                if self.magic_carrots_angle > 2 * 3.14159:
-                    self.magic_carrots_angle -= 2 * 3.14159
-                # --- Проверка столкновений с врагами для каждой морковки ---
-                px, py = self.rect.center
-                radius = 120
-                for i in range(self.magic_carrots_count):
-                    angle = self.magic_carrots_angle + i * (2 * math.pi / self.magic_carrots_count)
-                    carrot_x = px + radius * math.cos(angle)
-                    carrot_y = py + radius * math.sin(angle)
-                    if self.magic_carrots_image:
-                        carrot_rect = self.magic_carrots_image.get_rect(center=(carrot_x, carrot_y))
-                        for enemy in self.game.enemies:
-                            if carrot_rect.colliderect(enemy.rect):
-                                if not hasattr(enemy, f'carrot_last_hit_{i}') or now - getattr(enemy, f'carrot_last_hit_{i}', 0) > 300:
-                                    enemy.take_damage(5)
-                                    setattr(enemy, f'carrot_last_hit_{i}', now)
-        
-        # --- Piercing Carrot update ---
-        if self.piercing_carrot:
-            now = pygame.time.get_ticks()
-            if now - self.piercing_carrot_last_time > self.piercing_carrot_cooldown:
-                # Стреляем морковками в направлении курсора
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                # Получаем scale и surf_rect из main.py через game
-                scale = self.game.get_scale() if self.game.fullscreen else 1.0
-                screen_rect = self.game.screen.get_rect()
-                surf_w, surf_h = int(WIDTH * scale), int(HEIGHT * scale)
-                surf_rect = pygame.Rect(0, 0, surf_w, surf_h)
-                surf_rect.center = screen_rect.center
-                # Переводим координаты мыши в координаты игрового поля
-                rel_x = (mouse_x - surf_rect.x) / scale
-                rel_y = (mouse_y - surf_rect.y) / scale
-                cam = self.game.camera
-                # Переводим в мировые координаты
-                world_mouse_x = rel_x - cam.offset.x
-                world_mouse_y = rel_y - cam.offset.y
-                px, py = self.rect.center
-                dx = world_mouse_x - px
-                dy = world_mouse_y - py
-                length = (dx ** 2 + dy ** 2) ** 0.5
-                if length > 0:
-                    direction = (dx / length, dy / length)
-                    # Создаем несколько пронзающих морковок в зависимости от количества бонусов
-                    for i in range(self.piercing_carrot_count):
-                        # Добавляем небольшое отклонение для каждой морковки
-                        angle_offset = (i - (self.piercing_carrot_count - 1) / 2) * 0.2  # 0.2 радиан = ~11 градусов
-                        cos_offset = math.cos(angle_offset)
-                        sin_offset = math.sin(angle_offset)
-                        # Поворачиваем направление
-                        rotated_dx = direction[0] * cos_offset - direction[1] * sin_offset
-                        rotated_dy = direction[0] * sin_offset + direction[1] * cos_offset
-                        rotated_direction = (rotated_dx, rotated_dy)
-                        # Создаем пронзающую морковку
-                        piercing_carrot = PiercingCarrot(self.game, self, rotated_direction)
-                        self.game.all_sprites.add(piercing_carrot)
-                self.piercing_carrot_last_time = now
+        # Включает и выключает их game.scheduler (см. start_magic_carrots)
+        if self.magic_carrots_active:
+            now = self.game.sim_clock.get_ticks()
+            self.magic_carrots_angle += 0.12  # скорость вращения
+            if self.magic_carrots_angle > 2 * 3.14159:
+                self.magic_carrots_angle -= 2 * 3.14159
+            # --- Проверка столкновений с врагами для каждой морковки ---
+            px, py = self.rect.center
+            radius = 120
+            for i in range(self.magic_carrots_count):
+                angle = self.magic_carrots_angle + i * (2 * math.pi / self.magic_carrots_count)
+                carrot_x = px + radius * math.cos(angle)
+                carrot_y = py + radius * math.sin(angle)
+                if self.magic_carrots_image:
+                    carrot_rect = self.magic_carrots_image.get_rect(center=(carrot_x, carrot_y))
+                    for enemy in self.game.enemy_grid.query_rect(carrot_rect):
+                        if carrot_rect.colliderect(enemy.rect):
+                            last_hit = enemy.magic_carrot_hits.get(i)
+                            if last_hit is None or now - last_hit > 300:
+                                enemy.take_damage(5, "magic_carrots")
+                                enemy.magic_carrot_hits[i] = now
         
-        # --- Lightning update ---
-        if self.lightning:
-            now = pygame.time.get_ticks()
-            if now - self.lightning_last_time > self.lightning_cooldown:
-                # Ищем случайного врага в кадре
-                visible_enemies = []
-                for enemy in self.game.enemies:
-                    # Проверяем, что враг видим на экране
-                    enemy_screen_pos = self.game.camera.apply(enemy)
-                    if (0 <= enemy_screen_pos.x <= WIDTH and 
-                        0 <= enemy_screen_pos.y <= HEIGHT):
-                        visible_enemies.append(enemy)
-                
-                if visible_enemies:
-                    # Выбираем случайного врага
-                    target_enemy = random.choice(visible_enemies)
-                    # Создаем молнию
-                    from attack import LightningAttack
-                    lightning = LightningAttack(self.game, self, target_enemy)
-                    self.game.all_sprites.add(lightning)
-                self.lightning_last_time = now
         # --- Проверка отложенной атаки ---
         if self.pending_attack is not None:
-            current_time = pygame.time.get_ticks()
+            current_time = self.game.sim_clock.get_ticks()
             if current_time - self.attack_start_time >= self.attack_delay:
                 # Создаём атаку после задержки
                 direction = self.pending_attack
-                attack = SwingAttack(self.game, self, direction)
-                if random.random() < self.critical_chance:
+                attack = SwingAttack.acquire(self.game, self, direction)
+                if self.game.rng.random() < self.critical_chance:
                     attack.damage *= 2
                 attack.size_multiplier = self.attack_size_multiplier
                 if self.explosive_attack:
@@ -334,72 +239,114 @@ class Player(pygame.sprite.Sprite):
         # Обновляем позицию rect
         self.rect.x = self.x
         self.rect.y = self.y
-        
-        # --- Обновление красного цвета при получении урона ---
-        if self.is_flashing_red:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.damage_flash_timer > self.damage_flash_duration:
-                self.is_flashing_red = False
     
+    # --- Способности по таймерам game.scheduler (запускаются в apply_upgrade) ---
+    def start_magic_carrots(self):
+        """Морковки появляются на magic_carrots_duration, затем перезаряжаются"""
+        self.magic_carrots_active = True
+        # Старый «конец» не должен оборвать новое появление
+        if self.magic_carrots_stop_timer is not None:
+            self.magic_carrots_stop_timer.cancel()
+        self.magic_carrots_stop_timer = self.game.scheduler.call_later(self.magic_carrots_duration,
+                                                                       self.stop_magic_carrots)
+
+    def stop_magic_carrots(self):
+        self.magic_carrots_active = False
+        self.magic_carrots_stop_timer = None
+
+    def fire_piercing_carrots(self):
+        """Стреляем морковками в направлении курсора"""
+        direction = self.aim_direction()
+        if direction is None:
+            return
+        # Создаем несколько пронзающих морковок в зависимости от количества бонусов
+        for i in range(self.piercing_carrot_count):
+            # Добавляем небольшое отклонение для каждой морковки
+            angle_offset = (i - (self.piercing_carrot_count - 1) / 2) * 0.2  # 0.2 радиан = ~11 градусов
+            cos_offset = math.cos(angle_offset)
+            sin_offset = math.sin(angle_offset)
+            # Поворачиваем направление
+            rotated_dx = direction[0] * cos_offset - direction[1] * sin_offset
+            rotated_dy = direction[0] * sin_offset + direction[1] * cos_offset
+            rotated_direction = (rotated_dx, rotated_dy)
+            # Создаем пронзающую морковку
+            piercing_carrot = PiercingCarrot.acquire(self.game, self, rotated_direction)
+            self.game.all_sprites.add(piercing_carrot)
+
+    def strike_lightning(self):
+        """Молния бьёт случайного врага в кадре"""
+        visible_enemies = []
+        view_rect = pygame.Rect(-self.game.camera.offset.x, -self.game.camera.offset.y, WIDTH, HEIGHT)
+        for enemy in self.game.enemy_grid.query_rect(view_rect):
+            # Проверяем, что враг видим на экране
+            enemy_screen_pos = self.game.camera.apply(enemy)
+            if (0 <= enemy_screen_pos.x <= WIDTH and 
+                0 <= enemy_screen_pos.y <= HEIGHT):
+                visible_enemies.append(enemy)
+        
+        if visible_enemies:
+            # Выбираем случайного врага
+            target_enemy = self.game.rng.choice(visible_enemies)
+            # Создаем молнию
+            from attack import LightningAttack
+            lightning = LightningAttack(self.game, self, target_enemy)
+            self.game.all_sprites.add(lightning)
+
+    def stop_flashing_red(self):
+        self.is_flashing_red = False
+        self.damage_flash_timer = None
+
     def take_damage(self, amount):
         """Take damage with dodge chance"""
-        if random.random() < self.dodge_chance:
+        if self.game.rng.random() < self.dodge_chance:
             return  # Dodge the attack
         self.health -= amount
         self.health = max(0, self.health)
         
-        # Активируем красный цвет при получении урона
+        # Активируем красный цвет при получении урона (новый удар продлевает вспышку)
         self.is_flashing_red = True
-        self.damage_flash_timer = pygame.time.get_ticks()
+        if self.damage_flash_timer is not None:
+            self.damage_flash_timer.cancel()
+        self.damage_flash_timer = self.game.scheduler.call_later(self.damage_flash_duration, self.stop_flashing_red)
     
     def heal(self, amount):
         """Restore health"""
         self.health = min(self.health + amount, self.max_health)
     
-    def on_kill_enemy(self):
-        """Called when an enemy is killed"""
+    def on_kill_enemy(self, event):
+        """Called when an enemy is killed (KillEvent из game.events)"""
         # Vampirism
         if self.vampirism > 0:
             self.heal(self.vampirism)
     
+    def aim_direction(self):
+        """Единичный вектор от игрока к точке прицеливания (None, если она в центре игрока)"""
+        aim_x, aim_y = self.game.frame_input.aim
+        px, py = self.rect.center
+        dx = aim_x - px
+        dy = aim_y - py
+        length = (dx ** 2 + dy ** 2) ** 0.5
+        if length == 0:
+            return None
+        return (dx / length, dy / length)
+
     def can_attack(self):
         """Check if player can attack"""
-        current_time = pygame.time.get_ticks()
+        current_time = self.game.sim_clock.get_ticks()
         return current_time - self.last_attack_time >= self.attack_cooldown
     
     def attack(self, direction=None):
-        """Perform attack. Если direction не задан — вычислить по мыши."""
+        """Perform attack. Если direction не задан — вычислить по точке прицеливания."""
         if not self.can_attack():
             return None
         
-        # Если направление не задано — вычислить по мыши (в мировых координатах)
+        # Если направление не задано — вычислить по точке прицеливания (в мировых координатах)
         if direction is None:
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            # Получаем scale и surf_rect из main.py через game
-            scale = self.game.get_scale() if self.game.fullscreen else 1.0
-            screen_rect = self.game.screen.get_rect()
-            surf_w, surf_h = int(WIDTH * scale), int(HEIGHT * scale)
-            surf_rect = pygame.Rect(0, 0, surf_w, surf_h)
-            surf_rect.center = screen_rect.center
-            # Переводим координаты мыши в координаты игрового поля
-            rel_x = (mouse_x - surf_rect.x) / scale
-            rel_y = (mouse_y - surf_rect.y) / scale
-            cam = self.game.camera
-            # Переводим в мировые координаты
-            world_mouse_x = rel_x - cam.offset.x
-            world_mouse_y = rel_y - cam.offset.y
-            px, py = self.rect.center
-            dx = world_mouse_x - px
-            dy = world_mouse_y - py
-            length = (dx ** 2 + dy ** 2) ** 0.5
-            if length == 0:
-                direction = (1, 0)
-            else:
-                direction = (dx / length, dy / length)
+            direction = self.aim_direction() or (1, 0)
         
         # Сохраняем ожидающую атаку и время её начала
         self.pending_attack = direction
-        self.attack_start_time = pygame.time.get_ticks()
+        self.attack_start_time = self.game.sim_clock.get_ticks()
         self.last_attack_time = self.attack_start_time
         
         # Включаем анимацию атаки сразу
@@ -414,18 +361,16 @@ class Player(pygame.sprite.Sprite):
             self.attack_direction = "left"
         
         # Воспроизводим звук меча сразу при нажатии
-        if self.sword_sound:
-            # Применяем коэффициент громкости
-            volume_multiplier = get_volume_multiplier()
-            self.sword_sound.set_volume(0.3 * volume_multiplier)
-            self.sword_sound.play()
+        sound_bank.play("sword")
         
         return None  # Пока не создаём атаку, только планируем её
 
     def draw(self, surface, camera):
+        # Позиция игрока, интерполированная между шагами симуляции
+        render_rect = self.game.render_rect(self)
         # Сначала рисуем морковки, если активны
         if self.has_magic_carrots and self.magic_carrots_active and self.magic_carrots_image:
-            px, py = self.rect.center
+            px, py = render_rect.center
             radius = 120
             for i in range(self.magic_carrots_count):
                 angle = self.magic_carrots_angle + i * (2 * math.pi / self.magic_carrots_count)
@@ -434,32 +379,34 @@ class Player(pygame.sprite.Sprite):
                 rect = self.magic_carrots_image.get_rect(center=(carrot_x, carrot_y))
                 surface.blit(self.magic_carrots_image, rect)
         # Затем рисуем самого игрока
-        player_rect_on_screen = camera.apply(self)
+        player_rect_on_screen = camera.apply_rect(render_rect)
         
-        # Применяем красный цвет если игрок получил урон
+        # Применяем красный цвет если игрок получил урон (красные кадры создаются один раз)
         if self.is_flashing_red:
-            # Создаем красную версию изображения
-            red_surface = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-            red_surface.fill((255, 0, 0, 128))  # Красный цвет с прозрачностью
-            temp_image = self.image.copy()
-            temp_image.blit(red_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-            surface.blit(temp_image, player_rect_on_screen)
+            surface.blit(get_effect(self.image, "hurt"), player_rect_on_screen)
         else:
             surface.blit(self.image, player_rect_on_screen)
         # Рисуем полосу здоровья под игроком
-        from utils import draw_health_bar
-        bar_width = 40
-        bar_height = 6
-        bar_x = player_rect_on_screen.centerx - bar_width // 2
+        bar_x = player_rect_on_screen.centerx - self.health_bar.width // 2
         bar_y = player_rect_on_screen.bottom + 4  # чуть ниже спрайта
-        draw_health_bar(surface, bar_x, bar_y, self.health, self.max_health, width=bar_width, height=bar_height)
+        self.health_bar.draw(surface, (bar_x, bar_y))
 
     def apply_upgrade(self, upgrade):
+        # Перезарядки способностей ведёт game.scheduler; первый раз они срабатывают сразу
+        scheduler = self.game.scheduler
         if upgrade.effect_type == "magic_carrots":
             self.has_magic_carrots = True
             self.magic_carrots_count = min(self.magic_carrots_count + 1, 5)
+            if self.magic_carrots_timer is None:
+                self.magic_carrots_timer = scheduler.call_every(
+                    self.magic_carrots_duration + self.magic_carrots_cooldown, self.start_magic_carrots, delay=0)
         elif upgrade.effect_type == "piercing_carrot":
             self.piercing_carrot = True
             self.piercing_carrot_count = min(self.piercing_carrot_count + 1, 3)  # Максимум 3 морковки
+            if self.piercing_carrot_timer is None:
+                self.piercing_carrot_timer = scheduler.call_every(
+                    self.piercing_carrot_cooldown, self.fire_piercing_carrots, delay=0)
         elif upgrade.effect_type == "lightning":
-            self.lightning = True
\ No newline at end of file
+            self.lightning = True
+            if self.lightning_timer is None:
+                self.lightning_timer = scheduler.call_every(self.lightning_cooldown, self.strike_lightning, delay=0)
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""Запись и воспроизведение забегов.
+
+Забег полностью определяется зерном Game.rng и вводом на каждом шаге
+симуляции, поэтому в файл пишется только это. Раз в HASH_INTERVAL шагов
+туда же добавляется хэш состояния: при воспроизведении он пересчитывается,
+и первое расхождение сразу видно по номеру шага.
+
+Формат файла (little-endian): заголовок HEADER, затем поток записей,
+каждая начинается с байта-тега:
+    b"S" — ввод одного шага: флаги (W/S/A/D/атака) и прицел (2 x float32)
+    b"U" — выбранное улучшение (индекс)
+    b"H" — номер шага и 8 байт blake2b от состояния перед этим шагом
+"""
+import hashlib
+import struct
+from settings import SIM_HZ
+from controls import InputSource, FrameInput
+
+MAGIC = b"RGRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHQHBH")  # magic, версия, зерно, SIM_HZ, движок врагов, интервал хэшей
+STEP = struct.Struct("<Bff")
+UPGRADE = struct.Struct("<B")
+HASH = struct.Struct("<I8s")
+HASH_INTERVAL = 60  # раз в секунду игрового времени
+
+TAG_STEP = b"S"
+TAG_UPGRADE = b"U"
+TAG_HASH = b"H"
+_PAYLOADS = {TAG_STEP: STEP, TAG_UPGRADE: UPGRADE, TAG_HASH: HASH}
+
+# Биты флагов ввода
+UP, DOWN, LEFT, RIGHT, ATTACK = 1, 2, 4, 8, 16
+
+
+def encode_input(frame_input):
+    flags = 0
+    if frame_input.move_y < 0:
+        flags |= UP
+    elif frame_input.move_y > 0:
+        flags |= DOWN
+    if frame_input.move_x < 0:
+        flags |= LEFT
+    elif frame_input.move_x > 0:
+        flags |= RIGHT
+    if frame_input.attack:
+        flags |= ATTACK
+    return STEP.pack(flags, frame_input.aim[0], frame_input.aim[1])
+
+
+def decode_input(data):
+    flags, aim_x, aim_y = STEP.unpack(data)
+    move_x = (1 if flags & RIGHT else 0) - (1 if flags & LEFT else 0)
+    move_y = (1 if flags & DOWN else 0) - (1 if flags & UP else 0)
+    return FrameInput(move_x, move_y, (aim_x, aim_y), bool(flags & ATTACK))
+
+
+def state_hash(game):
+    """Короткий хэш состояния симуляции (позиции, здоровье, опыт, состояние ГСЧ)"""
+    digest = hashlib.blake2b(digest_size=8)
+    player = game.player
+    upgrades = game.upgrade_manager
+    digest.update(struct.pack("<Idddii", game.sim_clock.frame, player.x, player.y, player.health,
+                              upgrades.level, upgrades.current_kills))
+    enemy_values = []
+    for enemy in game.enemies:
+        enemy_values += (enemy.x, enemy.y, enemy.health)
+    digest.update(struct.pack(f"<{len(enemy_values)}d", *enemy_values))
+    carrot_values = []
+    for carrot in game.carrots:
+        carrot_values += (*carrot.rect.center, carrot.value)
+    digest.update(struct.pack(f"<{len(carrot_values)}i", *carrot_values))
+    digest.update(struct.pack("<I", len(game.all_sprites)))
+    digest.update(struct.pack("<625I", *game.rng.getstate()[1]))
+    return digest.digest()
+
+
+class Recorder(InputSource):
+    """Обёртка над источником ввода, которая пишет каждый шаг в файл"""
+
+    def __init__(self, source, path, hash_interval=HASH_INTERVAL):
+        self.source = source
+        self.path = path
+        self.hash_interval = hash_interval
+        self.file = None
+
+    def begin_run(self, game):
+        """Каждый новый забег перезаписывает файл (сохраняется последний забег)"""
+        self.source.begin_run(game)
+        self.close()
+        self.file = open(self.path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, game.seed, SIM_HZ,
+                                    game.enemy_engine is not None, self.hash_interval))
+
+    def request_attack(self):
+        self.source.request_attack()
+
+    def request_upgrade(self, index):
+        self.source.request_upgrade(index)
+
+    def poll(self, game):
+        frame = game.sim_clock.frame
+        if frame % self.hash_interval == 0:
+            self.file.write(TAG_HASH + HASH.pack(frame, state_hash(game)))
+        data = encode_input(self.source.poll(game))
+        self.file.write(TAG_STEP + data)
+        # Возвращаем уже округлённый до float32 ввод, чтобы запись и воспроизведение совпадали бит в бит
+        return decode_input(data)
+
+    def choose_upgrade(self, game):
+        index = self.source.choose_upgrade(game)
+        if index is not None:
+            self.file.write(TAG_UPGRADE + UPGRADE.pack(index))
+        return index
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class ReplayInput(InputSource):
+    """Источник ввода, читающий записанный забег"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.seed, sim_hz, use_enemy_engine, self.hash_interval = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: это не запись забега (или другая версия формата)")
+        if sim_hz != SIM_HZ:
+            print(f"Запись сделана при SIM_HZ={sim_hz}, сейчас {SIM_HZ}: воспроизведение разойдётся")
+        self.use_enemy_engine = bool(use_enemy_engine)
+        self.records = []
+        offset = HEADER.size
+        while offset < len(data):
+            tag = data[offset:offset + 1]
+            payload = _PAYLOADS[tag]
+            self.records.append((tag, data[offset + 1:offset + 1 + payload.size]))
+            offset += 1 + payload.size
+        self.frame_count = sum(1 for tag, _ in self.records if tag == TAG_STEP)
+        self.position = 0
+        self.divergences = []  # шаги, на которых хэш состояния не совпал
+        self.finished = False
+
+    def begin_run(self, game):
+        self.position = 0
+        self.divergences = []
+        self.finished = False
+
+    def _diverged(self, frame):
+        if not self.divergences:
+            print(f"Расхождение с записью на шаге {frame}")
+        self.divergences.append(frame)
+
+    def poll(self, game):
+        records = self.records
+        while self.position < len(records) and records[self.position][0] == TAG_HASH:
+            frame, expected = HASH.unpack(records[self.position][1])
+            self.position += 1
+            if frame != game.sim_clock.frame or state_hash(game) != expected:
+                self._diverged(game.sim_clock.frame)
+        if self.position < len(records) and records[self.position][0] == TAG_STEP:
+            data = records[self.position][1]
+            self.position += 1
+            return decode_input(data)
+        # Запись закончилась — дальше игрок стоит на месте
+        self.finished = True
+        return super().poll(game)
+
+    def choose_upgrade(self, game):
+        if self.position < len(self.records) and self.records[self.position][0] == TAG_UPGRADE:
+            index, = UPGRADE.unpack(self.records[self.position][1])
+            self.position += 1
+            return index
+        # В записи здесь не было экрана улучшений — берём первое, чтобы не зависнуть
+        self._diverged(game.sim_clock.frame)
+        return 0
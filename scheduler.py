@@ -0,0 +1,79 @@
+import heapq
+
+
+class Timer:
+    """Запланированный вызов; cancel() отменяет его (и все будущие повторы)"""
+    __slots__ = ("due", "interval", "callback", "args", "cancelled")
+
+    def __init__(self, due, interval, callback, args):
+        self.due = due
+        self.interval = interval  # None — вызвать один раз
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    @property
+    def active(self):
+        return not self.cancelled
+
+
+class Scheduler:
+    """Отложенные и повторяющиеся вызовы по часам clock (куча по времени срабатывания).
+
+    clock — любой объект с get_ticks() в миллисекундах: GameClock для игровых
+    событий (стоят вместе с симуляцией) или pygame.time для реального времени.
+    run_due() вызывается раз в шаг и достаёт только наступившие события, а не
+    опрашивает все таймеры. Отменённый таймер остаётся в куче до своего срока
+    и просто пропускается. Вызовы с одинаковым сроком идут в порядке
+    планирования, поэтому порядок событий воспроизводим.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self._heap = []
+        self._counter = 0  # порядок планирования для одинаковых сроков
+
+    def _push(self, timer):
+        self._counter += 1
+        heapq.heappush(self._heap, (timer.due, self._counter, timer))
+        return timer
+
+    def call_later(self, delay, callback, *args):
+        """Вызывает callback(*args) через delay мс"""
+        return self._push(Timer(self.clock.get_ticks() + delay, None, callback, args))
+
+    def call_every(self, interval, callback, *args, delay=None):
+        """Вызывает callback(*args) каждые interval мс; первый раз — через delay (по умолчанию interval)"""
+        if interval <= 0:
+            raise ValueError("interval должен быть больше нуля")
+        if delay is None:
+            delay = interval
+        return self._push(Timer(self.clock.get_ticks() + delay, interval, callback, args))
+
+    def run_due(self):
+        """Выполняет все события, срок которых наступил; возвращает их число"""
+        now = self.clock.get_ticks()
+        heap = self._heap
+        fired = 0
+        while heap and heap[0][0] <= now:
+            timer = heapq.heappop(heap)[2]
+            if timer.cancelled:
+                continue
+            if timer.interval is not None:
+                # Следующий срок считаем от прошлого, а не от now: период не «плывёт»
+                timer.due += timer.interval
+                self._push(timer)
+            else:
+                timer.cancelled = True  # одноразовый таймер после вызова неактивен
+            timer.callback(*timer.args)
+            fired += 1
+        return fired
+
+    def clear(self):
+        self._heap.clear()
+
+    def __len__(self):
+        return len(self._heap)
@@ -3,6 +3,14 @@ import pygame
 # Main settings
 WIDTH, HEIGHT = 1280, 720
 FPS = 60
+# Fixed simulation step: gameplay always advances in SIM_DT increments
+SIM_HZ = 60
+SIM_DT = 1 / SIM_HZ
+# Render frame cap (can be 120/144 for high refresh displays, 0 = uncapped)
+RENDER_FPS = FPS
+# Safety limits so a long hitch doesn't trigger a spiral of catch-up steps
+MAX_SIM_STEPS_PER_FRAME = 5
+MAX_FRAME_TIME = 0.25
 TILE_SIZE = 32
 
 # Colors
@@ -12,5 +20,28 @@ WHITE = (255, 255, 255)
 PLAYER_SPEED = 3
 PLAYER_HEALTH = 100
 
+# Spatial grid for enemies (enemies are ~1.5 tiles wide)
+ENEMY_GRID_CELL_SIZE = TILE_SIZE * 2
+# Vectorized NumPy enemy simulation (used only if numpy is installed)
+USE_ENEMY_ENGINE = True
+# Update level of detail: enemies farther than ENEMY_LOD_MARGIN outside the camera view
+# are updated every ENEMY_LOD_INTERVAL-th step with scaled movement (1 = always full rate)
+ENEMY_LOD_INTERVAL = 4
+ENEMY_LOD_MARGIN = TILE_SIZE * 4
+# Flow field toward the player: built in a (2 * radius + 1) tile window around the player,
+# which covers the camera view plus the LOD margin
+FLOW_FIELD_RADIUS = 24
+
+# Enemy spawning: cells up to SPAWN_RING_MAX_TILES from the player that are fully off-screen
+SPAWN_RING_MAX_TILES = 24
+# At most this many enemies appear in one simulation step (bursts are spread over frames)
+SPAWN_BUDGET_PER_STEP = 4
+# No new enemies while this many are alive
+MAX_LIVE_ENEMIES = 800
+# Damage is resolved once per step: at most this many floating damage numbers per step
+DAMAGE_NUMBERS_PER_STEP = 32
+# Rendered text surfaces kept in the LRU cache (text_cache.render_text)
+TEXT_CACHE_SIZE = 256
+
 # Camera
 CAMERA_OFFSET = (0, 0)
\ No newline at end of file
@@ -0,0 +1,68 @@
+import os
+import pygame
+from sound_settings import get_volume_multiplier
+
+# Все звуковые эффекты игры: имя -> (файл, базовая громкость, макс. одновременных голосов)
+SOUND_DEFINITIONS = {
+    "hit": ("hit_sound.wav", 0.1, 4),
+    "exp": ("exp_sound.wav", 0.3, 3),
+    "sword": ("sword_sound.mp3", 0.3, 2),
+    "walk": ("walk_sound.mp3", 0.04, 1),
+    "lvlup": ("lvlup_sound.mp3", 0.1, 1),
+    "menu_hover": ("menu_hover_sound.wav", 0.3, 2),
+}
+
+SOUNDS_DIR = os.path.join("assets", "sounds")
+
+_sounds = {}
+_failed = set()
+_applied_multiplier = {}
+_enabled = True
+
+
+def set_enabled(enabled):
+    """Включает или выключает все звуки (без окна звук не нужен)"""
+    global _enabled
+    _enabled = enabled
+
+
+def get_sound(name):
+    """Возвращает общий объект Sound (файл декодируется один раз) или None"""
+    if not _enabled:
+        return None
+    sound = _sounds.get(name)
+    if sound is not None or name in _failed:
+        return sound
+    filename, base_volume, _ = SOUND_DEFINITIONS[name]
+    try:
+        sound = pygame.mixer.Sound(os.path.join(SOUNDS_DIR, filename))
+        sound.set_volume(base_volume)
+    except (pygame.error, FileNotFoundError):
+        _failed.add(name)
+        print(f"Не удалось загрузить звук {filename}")
+        return None
+    _sounds[name] = sound
+    return sound
+
+
+def play(name):
+    """Проигрывает звук с учётом общей громкости и ограничения голосов"""
+    sound = get_sound(name)
+    if sound is None:
+        return None
+    _, base_volume, max_voices = SOUND_DEFINITIONS[name]
+    # Если этот звук уже звучит max_voices раз — новый голос не запускаем
+    if sound.get_num_channels() >= max_voices:
+        return None
+    # Громкость пересчитываем только когда ползунок в настройках изменился
+    volume_multiplier = get_volume_multiplier()
+    if _applied_multiplier.get(name) != volume_multiplier:
+        sound.set_volume(base_volume * volume_multiplier)
+        _applied_multiplier[name] = volume_multiplier
+    return sound.play()
+
+
+def preload():
+    """Заранее декодирует все звуки, чтобы первый удар не вызывал подвисания"""
+    for name in SOUND_DEFINITIONS:
+        get_sound(name)
@@ -0,0 +1,95 @@
+from settings import TILE_SIZE
+
+
+class SpatialHash:
+    """Равномерная сетка для быстрого поиска объектов рядом с точкой или прямоугольником.
+
+    Объект хранится в одной ячейке — по центру своего rect. Запросы расширяются
+    на половину размера самого крупного объекта, поэтому возвращают всех, чей rect
+    может пересекаться с областью; точную проверку делает вызывающий код.
+    Ячейки — словари (а не множества), чтобы порядок обхода был детерминированным.
+    """
+
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> {obj: None}
+        self.object_cells = {}  # obj -> (cx, cy)
+        self.padding = 0  # половина размера самого крупного объекта
+
+    def __len__(self):
+        return len(self.object_cells)
+
+    def __contains__(self, obj):
+        return obj in self.object_cells
+
+    def _cell_of(self, obj):
+        cx, cy = obj.rect.center
+        return (int(cx // self.cell_size), int(cy // self.cell_size))
+
+    def insert(self, obj):
+        """Добавляет объект в сетку (или обновляет его ячейку, если он уже там)"""
+        if obj in self.object_cells:
+            self.update(obj)
+            return
+        half_extent = (max(obj.rect.width, obj.rect.height) + 1) // 2
+        if half_extent > self.padding:
+            self.padding = half_extent
+        key = self._cell_of(obj)
+        self.cells.setdefault(key, {})[obj] = None
+        self.object_cells[obj] = key
+
+    def update(self, obj):
+        """Переносит объект в новую ячейку, если его центр её сменил"""
+        old_key = self.object_cells.get(obj)
+        if old_key is None:
+            return
+        key = self._cell_of(obj)
+        if key == old_key:
+            return
+        cell = self.cells[old_key]
+        del cell[obj]
+        if not cell:
+            del self.cells[old_key]
+        self.cells.setdefault(key, {})[obj] = None
+        self.object_cells[obj] = key
+
+    def remove(self, obj):
+        """Убирает объект из сетки (без ошибки, если его там нет)"""
+        key = self.object_cells.pop(obj, None)
+        if key is None:
+            return
+        cell = self.cells[key]
+        del cell[obj]
+        if not cell:
+            del self.cells[key]
+
+    def clear(self):
+        self.cells.clear()
+        self.object_cells.clear()
+        self.padding = 0
+
+    def _query_box(self, left, top, right, bottom):
+        size = self.cell_size
+        cells = self.cells
+        result = []
+        for cy in range(int(top // size), int(bottom // size) + 1):
+            for cx in range(int(left // size), int(right // size) + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    result.extend(cell)
+        return result
+
+    def query_rect(self, rect):
+        """Кандидаты, чей rect может пересекаться с rect (проверку colliderect делает вызывающий)"""
+        pad = self.padding
+        return self._query_box(rect.left - pad, rect.top - pad, rect.right + pad, rect.bottom + pad)
+
+    def query_radius(self, x, y, radius):
+        """Объекты, чей центр лежит не дальше radius от точки (x, y)"""
+        radius_sq = radius * radius
+        result = []
+        for obj in self._query_box(x - radius, y - radius, x + radius, y + radius):
+            ox, oy = obj.rect.center
+            if (ox - x) ** 2 + (oy - y) ** 2 <= radius_sq:
+                result.append(obj)
+        return result
@@ -0,0 +1,164 @@
+from settings import (WIDTH, HEIGHT, TILE_SIZE, SPAWN_RING_MAX_TILES, SPAWN_BUDGET_PER_STEP,
+                      MAX_LIVE_ENEMIES)
+from enemy import Enemy, ENEMY_ARCHETYPES
+
+# Кто появляется на каком уровне: (с какого уровня, {архетип из ENEMY_ARCHETYPES: вес}).
+# Строка действует до следующей; вес — относительная частота появления.
+_FARM_3 = {"cow": 1, "dark_cow": 1, "red_cow": 1}
+_LEVEL_5 = {**_FARM_3, "fox": 1, "sheep": 1, "chicken": 1, "pig": 1}
+_LEVEL_7 = {**_LEVEL_5, "red_fox": 1, "red_chicken": 1, "black_fox": 1, "black_chicken": 1, "lama": 1}
+_LEVEL_9 = {**_LEVEL_7, "red_lama": 1, "dark_lama": 1}
+_LEVEL_13 = {**_LEVEL_9, "boar": 1, "dark_boar": 1, "red_boar": 1}
+SPAWN_TABLE = [
+    (1, {"cow": 1}),
+    (2, {"cow": 1, "dark_cow": 1}),
+    (3, {**_FARM_3, "fox": 1, "sheep": 1}),
+    (5, _LEVEL_5),
+    (6, {**_LEVEL_5, "red_fox": 1, "red_chicken": 1}),
+    (7, _LEVEL_7),
+    (8, {**_LEVEL_7, "red_lama": 1}),
+    (9, _LEVEL_9),
+    (11, {**_LEVEL_9, "boar": 1}),
+    (13, _LEVEL_13),
+    (14, {name: weight for name, weight in _LEVEL_13.items() if name != "fox"}),
+    # Начинаем добавлять сильных гремлинов
+    (16, {"basic": 1, "fast": 1, **{name: weight for name, weight in _LEVEL_13.items()
+                                    if name not in _FARM_3 and name != "fox"}}),
+    (17, {"basic": 1, "fast": 1, "strong": 1, "fox": 1, "black_fox": 1, "red_fox": 1,
+          "chicken": 1, "black_chicken": 1, "red_chicken": 1,
+          "lama": 1, "dark_lama": 1, "red_lama": 1, "pig": 1, "sheep": 1}),
+]
+
+# Размер врага в тайлах с запасом: клетка появления должна быть за экраном целиком
+_SPRITE_TILES = 2
+
+
+def spawn_interval(level):
+    """Пауза между появлениями врагов (мс): минимум 300, быстрее уменьшается с уровнем"""
+    return max(300, 2000 - (level - 1) * 200)
+
+
+class AliasSampler:
+    """Выбор из взвешенного списка за O(1) (метод псевдонимов Уокера/Воуза)"""
+
+    def __init__(self, items, weights):
+        count = len(items)
+        total = sum(weights)
+        scaled = [weight * count / total for weight in weights]
+        self.items = list(items)
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    def sample(self, rng):
+        i = int(rng.random() * len(self.items))
+        return self.items[i] if rng.random() < self.prob[i] else self.items[self.alias[i]]
+
+
+def _spawn_ring():
+    """Смещения (в тайлах от тайла игрока), где враг появится целиком за экраном.
+
+    Камера всегда центрирована на игроке, поэтому кольцо не зависит от его
+    позиции и считается один раз. Смещения считаются от тайла игрока, а
+    камера — от его пикселя, который может быть до тайла правее и ниже:
+    поэтому справа и снизу нужен запас в один тайл.
+    """
+    half_w = WIDTH // 2
+    half_h = HEIGHT // 2
+    size = _SPRITE_TILES * TILE_SIZE
+    ring = []
+    radius = SPAWN_RING_MAX_TILES
+    for dy in range(-radius, radius + 1):
+        for dx in range(-radius, radius + 1):
+            if dx * dx + dy * dy > radius * radius:
+                continue
+            x = dx * TILE_SIZE
+            y = dy * TILE_SIZE
+            if x + size <= -half_w or x >= half_w + TILE_SIZE or y + size <= -half_h or y >= half_h + TILE_SIZE:
+                ring.append((dx, dy))
+    return ring
+
+
+class SpawnDirector:
+    """Появление врагов по таблице SPAWN_TABLE.
+
+    Таблица уровня компилируется в AliasSampler один раз и кэшируется, место
+    появления берётся из заранее посчитанного кольца клеток за экраном.
+    За один шаг появляется не больше SPAWN_BUDGET_PER_STEP врагов, а при
+    MAX_LIVE_ENEMIES живых новые не появляются вовсе. Враг, которому не
+    нашлось свободного места, остаётся в pending до следующего шага.
+    """
+
+    placement_tries = 8
+
+    def __init__(self, game):
+        self.game = game
+        self.last_spawn_time = game.sim_clock.get_ticks()
+        self.pending = 0  # сколько врагов ждут появления
+        self.ring = _spawn_ring()
+        self._samplers = {}  # индекс строки SPAWN_TABLE -> AliasSampler
+
+    def sampler_for(self, level):
+        row = 0
+        for index, (min_level, _) in enumerate(SPAWN_TABLE):
+            if level >= min_level:
+                row = index
+        sampler = self._samplers.get(row)
+        if sampler is None:
+            weights = SPAWN_TABLE[row][1]
+            sampler = AliasSampler(list(weights), list(weights.values()))
+            self._samplers[row] = sampler
+        return sampler
+
+    def update(self, now):
+        """Вызывается каждый шаг симуляции"""
+        game = self.game
+        if now - self.last_spawn_time > spawn_interval(game.upgrade_manager.level):
+            self.last_spawn_time = now
+            # Пока живых слишком много, очередь не копится
+            if len(game.enemies) < MAX_LIVE_ENEMIES:
+                self.pending += 1
+        spawned = 0
+        while self.pending and spawned < SPAWN_BUDGET_PER_STEP and len(game.enemies) < MAX_LIVE_ENEMIES:
+            if self.spawn() is None:
+                break  # вокруг нет свободного места — попробуем на следующем шаге
+            self.pending -= 1
+            spawned += 1
+
+    def find_spawn_tile(self):
+        """Случайная клетка кольца в пределах карты и не в стене, или None"""
+        game = self.game
+        game_map = game.map
+        rng = game.rng
+        player_tx = int(game.player.x // TILE_SIZE)
+        player_ty = int(game.player.y // TILE_SIZE)
+        ring = self.ring
+        size = _SPRITE_TILES * TILE_SIZE
+        for _ in range(self.placement_tries):
+            dx, dy = ring[rng.randrange(len(ring))]
+            x = player_tx + dx
+            y = player_ty + dy
+            if 0 <= x < game_map.width and 0 <= y < game_map.height and \
+                    not game_map.rect_blocked(x * TILE_SIZE, y * TILE_SIZE, size, size):
+                return x, y
+        return None
+
+    def spawn(self, archetype=None):
+        """Выпускает одного врага (по таблице уровня, если archetype не задан)"""
+        tile = self.find_spawn_tile()
+        if tile is None:
+            return None
+        game = self.game
+        if archetype is None:
+            archetype = self.sampler_for(game.upgrade_manager.level).sample(game.rng)
+        enemy = Enemy.acquire(game, tile[0], tile[1], ENEMY_ARCHETYPES[archetype])
+        game.add_enemy(enemy)
+        return enemy
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+
+import pygame
+from settings import TEXT_CACHE_SIZE
+
+# Шрифты процесса: (имя, размер) -> pygame.font.Font (SysFont создаётся один раз)
+_fonts = {}
+# Готовые надписи: (имя шрифта, размер, текст, цвет) -> поверхность, самые старые вытесняются
+_texts = OrderedDict()
+# Наборы цифр для чисел урона: (размер, цвет) -> DigitAtlas
+_atlases = {}
+
+
+def get_font(size, name=None):
+    """Общий шрифт для (name, size); name=None — шрифт pygame по умолчанию"""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
+
+
+def render_text(text, size, color, name=None):
+    """Надпись из LRU-кэша: повторная отрисовка того же текста не трогает шрифт.
+
+    Поверхность общая для всех вызовов — её нельзя менять на месте
+    (set_alpha и т.п. делайте на копии).
+    """
+    key = (name, size, text, color)
+    surface = _texts.get(key)
+    if surface is not None:
+        _texts.move_to_end(key)
+        return surface
+    surface = get_font(size, name).render(text, True, color)
+    _texts[key] = surface
+    if len(_texts) > TEXT_CACHE_SIZE:
+        _texts.popitem(last=False)
+    return surface
+
+
+class DigitAtlas:
+    """Заранее отрисованные символы числа; compose() собирает число без шрифта"""
+
+    chars = "0123456789-."
+
+    def __init__(self, size, color):
+        font = get_font(size)
+        self.glyphs = {char: font.render(char, True, color) for char in self.chars}
+        self.height = max(glyph.get_height() for glyph in self.glyphs.values())
+
+    def compose(self, value):
+        """Новая поверхность с числом value (своя у каждого вызова: её можно менять)"""
+        glyphs = [self.glyphs[char] for char in str(value)]
+        surface = pygame.Surface((sum(glyph.get_width() for glyph in glyphs), self.height), pygame.SRCALPHA)
+        x = 0
+        for glyph in glyphs:
+            surface.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        return surface
+
+
+def get_digit_atlas(size, color):
+    atlas = _atlases.get((size, color))
+    if atlas is None:
+        atlas = DigitAtlas(size, color)
+        _atlases[(size, color)] = atlas
+    return atlas
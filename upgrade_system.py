@@ -1,8 +1,8 @@
 import pygame
 import random
 from settings import *
-import os
-from sound_settings import get_volume_multiplier
+import sound_bank
+from attack import prepare_swing_frames
 
 class Upgrade:
     def __init__(self, name, description, effect_type, effect_value, rarity="common", unique=False):
@@ -25,21 +25,16 @@ class Upgrade:
         return colors.get(self.rarity, (200, 200, 200))
 
 class UpgradeManager:
-    def __init__(self):
-        # --- Загрузка звука повышения уровня ---
-        try:
-            self.lvlup_sound = pygame.mixer.Sound(os.path.join("assets", "sounds", "lvlup_sound.mp3"))
-            self.lvlup_sound.set_volume(0.1)  # Устанавливаем громкость на 10%
-        except:
-            self.lvlup_sound = None
-            print("Не удалось загрузить звук повышения уровня")
-        
+    def __init__(self, rng=None, scheduler=None):
+        self.rng = rng if rng is not None else random  # Генератор забега (для воспроизводимости)
+        self.scheduler = scheduler  # Для отложенного звука повышения уровня (None — сразу)
         self.available_upgrades = self.create_upgrade_pool()
         self.player_upgrades = []
         self.kills_until_upgrade = 5
         self.current_kills = 0
         self.showing_upgrade_screen = False
         self.upgrade_options = []
+        self.pending_upgrades = 0  # уровни, за которые улучшение ещё не выбрано
         self.level = 1
         self.boss_spawned = False
         
@@ -60,27 +55,34 @@ class UpgradeManager:
         ]
         return upgrades
     
-    def on_experience_orb_collected(self):
-        """Вызывается при сборе сферы опыта игроком"""
-        self.current_kills += 1
-        if self.current_kills >= self.kills_until_upgrade:
+    def on_experience_orb_collected(self, value=1):
+        """Вызывается при сборе опыта игроком; value — сколько морковок собрано за раз"""
+        self.current_kills += value
+        if self.current_kills < self.kills_until_upgrade:
+            return None
+        result = None
+        # Большая стопка может дать сразу несколько уровней
+        while self.current_kills >= self.kills_until_upgrade:
             self.level += 1
-            # Воспроизводим звук повышения уровня с небольшой задержкой
-            if self.lvlup_sound:
-                pygame.time.wait(50)  # Небольшая задержка в 50мс
-                # Применяем коэффициент громкости
-                volume_multiplier = get_volume_multiplier()
-                self.lvlup_sound.set_volume(0.1 * volume_multiplier)
-                self.lvlup_sound.play()
-            self.show_upgrade_screen()
-            self.current_kills = 0
+            self.pending_upgrades += 1
+            # Излишек стопки переносится на следующий уровень
+            self.current_kills -= self.kills_until_upgrade
             # Сбалансированный рост требуемого опыта
             self.kills_until_upgrade = int(self.kills_until_upgrade * 1.35)
             # Проверяем, нужно ли спавнить босса
             if self.level == 5 and not self.boss_spawned:
                 self.boss_spawned = True
-                return "spawn_boss"
-        return None
+                result = "spawn_boss"
+        # Воспроизводим звук повышения уровня с небольшой задержкой
+        if sound_bank.get_sound("lvlup"):
+            if self.scheduler is not None:
+                self.scheduler.call_later(50, sound_bank.play, "lvlup")  # Небольшая задержка в 50мс
+            else:
+                sound_bank.play("lvlup")
+        # Улучшения выбираются по одному: следующий экран — после выбора (см. select_upgrade)
+        if not self.showing_upgrade_screen:
+            self.show_upgrade_screen()
+        return result
     
     def on_enemy_killed(self):
         """Больше не начисляет опыт напрямую! Только для спавна босса."""
@@ -93,6 +95,7 @@ class UpgradeManager:
     def show_upgrade_screen(self):
         """Показывает экран выбора улучшений"""
         self.showing_upgrade_screen = True
+        self.pending_upgrades = max(0, self.pending_upgrades - 1)
         # Все бонусы выпадают случайно независимо от уровня
         self.upgrade_options = self.get_random_upgrades(3)
     
@@ -114,7 +117,7 @@ class UpgradeManager:
                 available.append(upgrade)
         if len(available) < count:
             available = self.available_upgrades.copy()
-        return random.sample(available, min(count, len(available)))
+        return self.rng.sample(available, min(count, len(available)))
     
     def select_upgrade(self, upgrade_index):
         """Выбирает улучшение и применяет его к игроку"""
@@ -123,6 +126,9 @@ class UpgradeManager:
             self.player_upgrades.append(selected_upgrade)
             self.showing_upgrade_screen = False
             self.upgrade_options = []
+            # За уровни из той же стопки — следующий выбор
+            if self.pending_upgrades:
+                self.show_upgrade_screen()
             return selected_upgrade
         return None
     
@@ -145,6 +151,8 @@ class UpgradeManager:
             player.attack_size_multiplier += upgrade.effect_value
             if player.attack_size_multiplier < 0.2:
                 player.attack_size_multiplier = 0.2
+            # Кадры взмаха старого размера больше не понадобятся
+            prepare_swing_frames(player.attack_size_multiplier)
         elif upgrade.effect_type == "vampirism":
             player.vampirism = upgrade.effect_value
         elif upgrade.effect_type == "critical_chance":
@@ -159,83 +167,3 @@ class UpgradeManager:
             player.piercing_carrot = True
         elif upgrade.effect_type == "lightning":
             player.lightning = True
-    
-    def draw_upgrade_screen(self, screen):
-        """Отрисовывает экран выбора улучшений"""
-        if not self.showing_upgrade_screen:
-            return
-        
-        # Затемнение фона
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        screen.blit(overlay, (0, 0))
-        
-        # Заголовок
-        font_large = pygame.font.SysFont(None, 48)
-        title = font_large.render("ВЫБЕРИТЕ УЛУЧШЕНИЕ", True, (255, 255, 255))
-        screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 50))
-        
-        # Инструкция
-        font_small = pygame.font.SysFont(None, 24)
-        instruction = font_small.render("Нажмите 1, 2 или 3 для выбора", True, (200, 200, 200))
-        screen.blit(instruction, (WIDTH // 2 - instruction.get_width() // 2, 100))
-        
-        # Отображение улучшений
-        for i, upgrade in enumerate(self.upgrade_options):
-            self.draw_upgrade_option(screen, upgrade, i, WIDTH // 2, 150 + i * 120)
-    
-    def draw_upgrade_option(self, screen, upgrade, index, center_x, y):
-        """Отрисовывает одно улучшение"""
-        font_name = pygame.font.SysFont(None, 32)
-        font_desc = pygame.font.SysFont(None, 20)
-        font_key = pygame.font.SysFont(None, 24)
-        
-        # Фон карточки
-        card_width = 300
-        card_height = 100
-        card_rect = pygame.Rect(center_x - card_width // 2, y, card_width, card_height)
-        pygame.draw.rect(screen, (50, 50, 50), card_rect)
-        pygame.draw.rect(screen, upgrade.color, card_rect, 3)
-        
-        # Название
-        name_text = font_name.render(upgrade.name, True, upgrade.color)
-        screen.blit(name_text, (center_x - name_text.get_width() // 2, y + 10))
-        
-        # Описание (поддерживает переносы строк)
-        desc_lines = upgrade.description.split('\n')
-        for i, line in enumerate(desc_lines):
-            desc_text = font_desc.render(line, True, (200, 200, 200))
-            screen.blit(desc_text, (center_x - desc_text.get_width() // 2, y + 40 + i * 15))
-        
-        # Клавиша выбора
-        key_text = font_key.render(f"{index + 1}", True, (255, 255, 255))
-        key_rect = pygame.Rect(center_x - card_width // 2 - 30, y + 35, 20, 20)
-        pygame.draw.rect(screen, (100, 100, 100), key_rect)
-        pygame.draw.rect(screen, (255, 255, 255), key_rect, 2)
-        screen.blit(key_text, (key_rect.x + 5, key_rect.y + 2))
-    
-    def draw_progress(self, screen):
-        """Отрисовывает прогресс до следующего улучшения"""
-        if self.showing_upgrade_screen:
-            return
-        
-        font = pygame.font.SysFont(None, 24)
-        progress_text = font.render(f"Уровень: {self.level} | Морковок до улучшения: {self.current_kills}/{self.kills_until_upgrade}", True, (255, 255, 255))
-        screen.blit(progress_text, (10, 60))
-        
-        # Прогресс-бар
-        bar_width = 200
-        bar_height = 10
-        bar_x, bar_y = 10, 90
-        
-        # Фон прогресс-бара
-        pygame.draw.rect(screen, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
-        
-        # Заполнение прогресс-бара
-        progress = self.current_kills / self.kills_until_upgrade
-        fill_width = int(bar_width * progress)
-        pygame.draw.rect(screen, (100, 255, 100), (bar_x, bar_y, fill_width, bar_height))
-        
-        # Рамка прогресс-бара
-        pygame.draw.rect(screen, (255, 255, 255), (bar_x, bar_y, bar_width, bar_height), 1) 
\ No newline at end of file